@@ -1,4 +1,6 @@
 import streamlit as st
+from collections import deque
+from instrumentacao import perfil
 
 st.set_page_config(
     page_title="Análise de Dados Musicais",
@@ -13,5 +15,65 @@ page_4 = st.Page("pythonbanco.py", title="Banco", icon="🎵")
 # Set up navigation
 pg = st.navigation([main_page, page_2, page_3, page_4])
 
+# Painel de tempos: liga a instrumentação só para esta sessão
+perfil_ativo = st.sidebar.toggle("⏱️ Painel de tempos", key="perfil_ativo")
+if 'rastros' not in st.session_state:
+    st.session_state.rastros = deque(maxlen=20)
+# Spans dos jobs em segundo plano iniciados por esta sessão com o painel ligado
+if 'spans_fundo' not in st.session_state:
+    st.session_state.spans_fundo = deque(maxlen=200)
+
+def exibir_painel_tempos(rastro):
+    import pandas as pd
+    with st.sidebar.expander("⏱️ Tempos do rerun", expanded=True):
+        st.metric("Rerun", f"{rastro.duracao_ms:,.1f} ms")
+        if rastro.spans:
+            # Ordem de início, com recuo pela profundidade do span
+            spans = sorted(rastro.spans, key=lambda s: s[1])
+            st.dataframe(
+                pd.DataFrame({
+                    "span": ["  " * profundidade + nome for nome, _, _, profundidade in spans],
+                    "ms": [round(duracao, 2) for _, _, duracao, _ in spans],
+                }),
+                hide_index=True,
+            )
+        if rastro.contadores:
+            st.json(dict(rastro.contadores), expanded=False)
+        # Reruns anteriores, inclusive os interrompidos por st.rerun/st.stop (botões, fragmento do job)
+        anteriores = list(st.session_state.rastros)[-11:-1]
+        if anteriores:
+            st.caption("Reruns anteriores")
+            st.dataframe(
+                pd.DataFrame({
+                    "rerun": [r.nome for r in reversed(anteriores)],
+                    "ms": [round(r.duracao_ms, 2) for r in reversed(anteriores)],
+                    "spans": [len(r.spans) for r in reversed(anteriores)],
+                }),
+                hide_index=True,
+            )
+        medidores = perfil.medidores()
+        if medidores:
+            st.caption("Contadores do processo")
+            st.json(medidores, expanded=False)
+        fundo = perfil.spans_fundo(st.session_state.spans_fundo)
+        if fundo:
+            st.caption("Segundo plano (últimos)")
+            st.dataframe(pd.DataFrame(fundo[-10:])[["nome", "duracao_ms"]], hide_index=True)
+        st.download_button(
+            "Exportar rastros (JSON)",
+            data=perfil.exportar_json(st.session_state.rastros, st.session_state.spans_fundo),
+            file_name="rastros.json",
+            mime="application/json",
+        )
+
 # Run the selected page
-pg.run()
\ No newline at end of file
+rastro = perfil.iniciar(pg.title, perfil_ativo, st.session_state.spans_fundo)
+try:
+    pg.run()
+finally:
+    # st.rerun()/st.stop() e exceções também fecham o rastro, que vai para o histórico da sessão
+    perfil.finalizar()
+    if rastro is not None:
+        st.session_state.rastros.append(rastro)
+if rastro is not None:
+    exibir_painel_tempos(rastro)
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""Índices do Banco (CPF e número da conta) contra a busca linear nas listas
+
+Cria 100 mil usuários e contas e mede cadastro e buscas por CPF e por número da conta.
+A busca linear (como era feita em pythonbanco.py) é medida numa amostra menor.
+
+    python benchmarks/busca_banco.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sistema_bancario.modelos import Banco
+
+USUARIOS = 100_000
+BUSCAS = 100_000
+BUSCAS_LINEARES = 200
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def filtrar_usuario_linear(banco, cpf):
+    usuarios_filtrados = [usuario for usuario in banco.usuarios if usuario.cpf == cpf]
+    return usuarios_filtrados[0] if usuarios_filtrados else None
+
+
+def buscar_conta_linear(banco, agencia, numero_conta):
+    return next((c for c in banco.contas if c.agencia == agencia and c.numero_conta == numero_conta), None)
+
+
+def cadastrar(banco, quantidade):
+    for i in range(quantidade):
+        cpf = f"{i:011d}"
+        banco.criar_usuario(f"Usuário {i}", "01-01-1990", cpf, "Rua A, 1 - Centro - Cidade/UF")
+        banco.criar_conta(cpf)
+
+
+if __name__ == "__main__":
+    banco = Banco("0001")
+    _, tempo_cadastro = medir(lambda: cadastrar(banco, USUARIOS))
+    print(f"cadastro de {USUARIOS:,} usuários + contas: {tempo_cadastro:.2f}s")
+
+    aleatorio = random.Random(0)
+    cpfs = [f"{aleatorio.randrange(USUARIOS):011d}" for _ in range(BUSCAS)]
+    numeros = [aleatorio.randrange(1, USUARIOS + 1) for _ in range(BUSCAS)]
+
+    encontrados, tempo = medir(lambda: [banco.filtrar_usuario(cpf) for cpf in cpfs])
+    assert all(encontrados)
+    print(f"filtrar_usuario (índice)   {tempo / BUSCAS * 1e6:10.2f} µs por busca")
+    encontrados, tempo = medir(lambda: [banco.buscar_conta("0001", numero) for numero in numeros])
+    assert all(encontrados)
+    print(f"buscar_conta (índice)      {tempo / BUSCAS * 1e6:10.2f} µs por busca")
+
+    amostra = cpfs[:BUSCAS_LINEARES]
+    encontrados, tempo = medir(lambda: [filtrar_usuario_linear(banco, cpf) for cpf in amostra])
+    assert encontrados == [banco.filtrar_usuario(cpf) for cpf in amostra]
+    print(f"filtrar_usuario (linear)   {tempo / BUSCAS_LINEARES * 1e6:10.2f} µs por busca")
+    amostra = numeros[:BUSCAS_LINEARES]
+    encontrados, tempo = medir(lambda: [buscar_conta_linear(banco, "0001", numero) for numero in amostra])
+    assert encontrados == [banco.buscar_conta("0001", numero) for numero in amostra]
+    print(f"buscar_conta (linear)      {tempo / BUSCAS_LINEARES * 1e6:10.2f} µs por busca")
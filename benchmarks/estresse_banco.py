@@ -0,0 +1,81 @@
+"""Estresse do Banco com várias threads, diário e snapshots
+
+Confere que a soma dos saldos bate com depósitos menos saques aceitos, que nenhum
+saldo fica negativo e que o banco recuperado do snapshot + diário é idêntico.
+
+    python benchmarks/estresse_banco.py
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sistema_bancario.modelos import Banco
+
+NUMERO_CONTAS = 64
+
+
+def executar(pasta, threads, operacoes, snapshot_a_cada=None):
+    caminho_diario = os.path.join(pasta, "diario.log")
+    caminho_snapshot = os.path.join(pasta, "snapshot.pkl")
+    for caminho in (caminho_diario, caminho_snapshot):
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    banco = Banco.abrir("0001", caminho_diario, caminho_snapshot, snapshot_a_cada=snapshot_a_cada)
+    for i in range(NUMERO_CONTAS):
+        banco.criar_usuario(f"Usuário {i}", "01-01-1990", str(i), "")
+    contas = [banco.criar_conta(str(i))[2] for i in range(NUMERO_CONTAS)]
+    # Sem limites de saque: o estresse é sobre concorrência, não sobre regras
+    for conta in contas:
+        conta.limite_saques = 10 ** 9
+        conta.limite_valor_saque = 10 ** 9
+
+    depositos = [0.0] * threads
+    saques = [0.0] * threads
+
+    def trabalhar(indice):
+        aleatorio = random.Random(indice)
+        for _ in range(operacoes):
+            conta = aleatorio.choice(contas)
+            valor = float(aleatorio.randint(1, 100))
+            if aleatorio.random() < 0.6:
+                if banco.depositar(conta, valor)[0]:
+                    depositos[indice] += valor
+            elif banco.sacar(conta, valor)[0]:
+                saques[indice] += valor
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    duracao = time.perf_counter() - inicio
+
+    total = sum(conta.saldo for conta in contas)
+    assert abs(total - (sum(depositos) - sum(saques))) < 1e-6, "saldo total não bate com as operações aceitas"
+    assert all(conta.saldo >= 0 for conta in contas), "saldo negativo"
+    lotes = banco.diario.lotes
+    banco.diario.fechar()
+
+    recuperado = Banco.abrir("0001", caminho_diario, caminho_snapshot)
+    assert [c.saldo for c in recuperado.contas] == [c.saldo for c in contas], "recuperação divergente"
+    assert [len(c.extrato) for c in recuperado.contas] == [len(c.extrato) for c in contas], "extrato divergente"
+    recuperado.diario.fechar()
+
+    print(
+        f"threads={threads} operações={threads * operacoes} "
+        f"{threads * operacoes / duracao:,.0f} op/s lotes={lotes} snapshot_a_cada={snapshot_a_cada} ok"
+    )
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as pasta:
+        executar(pasta, 1, 2000)
+        executar(pasta, 16, 2000)
+        executar(pasta, 16, 2000, snapshot_a_cada=5000)
@@ -0,0 +1,51 @@
+"""Tempo até o primeiro render de cada página e dependências pesadas carregadas
+
+Cada página roda num processo novo via AppTest (mediana de algumas execuções), a partir
+de uma pasta temporária, com o geocoding no backend "stub" para não depender de rede.
+
+    python benchmarks/inicializacao_paginas.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGINAS = ["main.py", "page2.py", "page3.py", "pythonbanco.py"]
+EXECUCOES = 3
+
+# Módulos que só devem ser importados quando a funcionalidade correspondente é usada
+PESADOS = ["langchain_openai", "langchain_core", "sklearn", "plotly.express", "pydeck", "geopy", "pyarrow.parquet"]
+
+SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({pagina!r}, default_timeout=120)
+app.secrets["config"] = {{"geocoding_backend": "stub"}}
+inicio = time.perf_counter()
+app.run()
+print(json.dumps({{
+    "render_ms": (time.perf_counter() - inicio) * 1000,
+    "excecoes": [str(e.value) for e in app.exception],
+    "pesados": [m for m in {pesados!r} if m in sys.modules],
+}}))
+"""
+
+
+def medir_pagina(pagina, pasta):
+    codigo = SCRIPT.format(raiz=RAIZ, pagina=os.path.join(RAIZ, pagina), pesados=PESADOS)
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, cwd=pasta, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as pasta:
+        for pagina in PAGINAS:
+            resultados = [medir_pagina(pagina, pasta) for _ in range(EXECUCOES)]
+            mediana = statistics.median(r["render_ms"] for r in resultados)
+            excecoes = resultados[0]["excecoes"]
+            print(f"{pagina:<16} {mediana:7.0f} ms  pesados carregados: {resultados[0]['pesados'] or '-'}"
+                  + (f"  EXCEÇÃO: {excecoes}" if excecoes else ""))
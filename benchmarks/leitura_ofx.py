@@ -0,0 +1,96 @@
+"""Leitor OFX incremental (financas.ofx) contra o caminho antigo com ofxparse
+
+Gera extratos SGML sintéticos com várias contas, confere que as duas leituras dão as
+mesmas linhas e mede o tempo de cada uma. ofxparse não faz mais parte do
+requirements.txt; sem ele, só o leitor novo é medido.
+
+    pip install ofxparse
+    python benchmarks/leitura_ofx.py
+"""
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from financas.ofx import ler_ofx
+
+CABECALHO = (
+    "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nSECURITY:NONE\nENCODING:USASCII\nCHARSET:1252\n"
+    "COMPRESSION:NONE\nOLDFILEUID:NONE\nNEWFILEUID:NONE\n\n<OFX>\n"
+    "<SIGNONMSGSRSV1><SONRS><STATUS><CODE>0<SEVERITY>INFO</STATUS><DTSERVER>20240902"
+    "<LANGUAGE>POR</SONRS></SIGNONMSGSRSV1>\n<BANKMSGSRSV1>\n"
+)
+
+
+def gerar_ofx(transacoes, contas=3, semente=0):
+    """Bytes de um OFX 1.x (CP1252) com `transacoes` lançamentos divididos entre `contas`"""
+    aleatorio = random.Random(semente)
+    partes = [CABECALHO]
+    fitid = 0
+    for conta in range(contas):
+        partes.append(
+            "<STMTTRNRS><TRNUID>1<STATUS><CODE>0<SEVERITY>INFO</STATUS><STMTRS><CURDEF>BRL"
+            f"<BANKACCTFROM><BANKID>0001<ACCTID>{conta}<ACCTTYPE>CHECKING</BANKACCTFROM>"
+            "<BANKTRANLIST><DTSTART>20240101<DTEND>20241231\n"
+        )
+        for _ in range(transacoes // contas):
+            fitid += 1
+            partes.append(
+                "<STMTTRN>\n<TRNTYPE>DEBIT\n"
+                f"<DTPOSTED>20240{aleatorio.randint(1, 9)}{aleatorio.randint(10, 28)}100000[-3:BRT]\n"
+                f"<TRNAMT>-{aleatorio.randint(1, 999)}.{aleatorio.randint(10, 99)}\n"
+                f"<FITID>{fitid}\n"
+                "<MEMO>Compra com Cartão - 31/08 18:35 MP*KAKABENTO &amp; CIA\n</STMTTRN>\n"
+            )
+        partes.append("</BANKTRANLIST><LEDGERBAL><BALAMT>0<DTASOF>20240902</LEDGERBAL></STMTRS></STMTTRNRS>\n")
+    partes.append("</BANKMSGSRSV1></OFX>\n")
+    return "".join(partes).encode("cp1252")
+
+
+def ler_com_ofxparse(conteudo):
+    """Leitura como era feita em page2.py antes do leitor incremental"""
+    import ofxparse
+
+    ofx = ofxparse.OfxParser.parse(io.StringIO(conteudo.decode("ISO-8859-1")))
+    return pd.DataFrame([
+        {"Data": pd.Timestamp(transacao.date.date()), "Valor": float(transacao.amount),
+         "Descrição": transacao.memo, "ID": transacao.id}
+        for conta in ofx.accounts
+        for transacao in conta.statement.transactions
+    ])
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    try:
+        import ofxparse  # noqa: F401
+        com_ofxparse = True
+    except ImportError:
+        com_ofxparse = False
+        print("ofxparse não instalado: medindo só o leitor incremental")
+
+    for transacoes in (2_000, 10_000, 100_000):
+        conteudo = gerar_ofx(transacoes)
+        novo, tempo_novo = medir(ler_ofx, io.BytesIO(conteudo))
+        linha = f"{transacoes:>7} transações  {len(conteudo) / 2**20:6.1f} MiB  ler_ofx={tempo_novo:7.3f}s"
+        # Acima de 10 mil transações o ofxparse leva minutos
+        if com_ofxparse and transacoes <= 10_000:
+            antigo, tempo_antigo = medir(ler_com_ofxparse, conteudo)
+            assert len(novo) == len(antigo), "quantidade de linhas diferente"
+            assert (novo["Valor"].values == antigo["Valor"].values).all(), "valores diferentes"
+            assert (novo["Data"].values == antigo["Data"].values).all(), "datas diferentes"
+            assert (novo["Descrição"].values == antigo["Descrição"].values).all(), "descrições diferentes"
+            # O ID no histórico é "conta:FITID"
+            assert (novo["ID"].str.split(":").str[-1].values == antigo["ID"].values).all(), "FITIDs diferentes"
+            linha += f"  ofxparse={tempo_antigo:7.3f}s  ({tempo_antigo / tempo_novo:,.0f}x)"
+        print(linha)
@@ -0,0 +1,76 @@
+"""Quadro tipado e categórico (preparar_transacoes) contra o preparo antigo com .apply
+
+Gera 1 milhão de transações sintéticas e compara tempo de preparo, memória do quadro
+e o custo por rerun dos filtros de mês/categoria com groupby.
+
+    python benchmarks/preparacao_transacoes.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from financas.transacoes import preparar_transacoes
+
+LINHAS = 1_000_000
+CATEGORIAS = np.array(["Alimentação", "Receitas", "Saúde", "Mercado", "Educação", "Compras", "Transporte", "Outros"])
+
+
+def gerar_transacoes(linhas, semente=0):
+    aleatorio = np.random.default_rng(semente)
+    return pd.DataFrame({
+        "Data": pd.Timestamp("2020-01-01") + pd.to_timedelta(aleatorio.integers(0, 1800, linhas), unit="D"),
+        "Valor": aleatorio.normal(-50, 100, linhas),
+        "Descrição": "Compra",
+        "ID": np.arange(linhas).astype(str),
+        "Categoria": CATEGORIAS[aleatorio.integers(0, len(CATEGORIAS), linhas)],
+    })
+
+
+def preparar_antigo(df):
+    """Preparo como era feito em page2.py: datas como objetos date e colunas de texto via .apply"""
+    df["Data"] = df["Data"].dt.date
+    df["Mês"] = df["Data"].apply(lambda x: f"{x.year}-{x.month:02d}")
+    df["Tipo"] = df["Valor"].apply(lambda x: "Receita" if x > 0 else "Despesa")
+    despesas = df[df["Valor"] < 0].copy()
+    despesas["Valor_Absoluto"] = despesas["Valor"].abs()
+    return df, despesas
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def filtrar(despesas, mes, categorias):
+    """O que o dashboard faz a cada rerun: filtro de mês e categorias e dois groupbys"""
+    filtrado = despesas[despesas["Mês"] == mes]
+    filtrado = filtrado[filtrado["Categoria"].isin(categorias)]
+    filtrado.groupby("Categoria", observed=True)["Valor_Absoluto"].sum()
+    despesas.groupby("Categoria", observed=True)["Valor_Absoluto"].sum()
+
+
+if __name__ == "__main__":
+    base = gerar_transacoes(LINHAS)
+    (antigo, despesas_antigo), tempo_antigo = medir(preparar_antigo, base.copy())
+    (novo, despesas_novo), tempo_novo = medir(preparar_transacoes, base.copy())
+    assert (despesas_antigo["Mês"].values == despesas_novo["Mês"].astype(str).values).all(), "meses diferentes"
+
+    print(f"{LINHAS:,} transações")
+    print(f"preparo   antigo={tempo_antigo:6.2f}s  novo={tempo_novo:6.2f}s")
+    print(f"memória   antigo={memoria_mb(antigo):6.0f}MB  novo={memoria_mb(novo):6.0f}MB")
+
+    mes = sorted(despesas_antigo["Mês"].unique())[-1]
+    categorias = list(CATEGORIAS[:5])
+    for nome, despesas in (("antigo", despesas_antigo), ("novo", despesas_novo)):
+        _, tempo = medir(lambda: [filtrar(despesas, mes, categorias) for _ in range(10)])
+        print(f"filtros   {nome}={tempo / 10:6.3f}s por rerun")
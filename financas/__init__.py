@@ -0,0 +1 @@
+# Lógica do dashboard de finanças (page2.py), separada do script da página
@@ -0,0 +1,91 @@
+import asyncio
+import random
+import time
+
+# Status HTTP que valem nova tentativa (limite de taxa e falhas temporárias)
+STATUS_TRANSITORIOS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class BaldeTokens:
+    """Token bucket: libera até `taxa` requisições por segundo, com rajadas de `capacidade`"""
+
+    def __init__(self, taxa, capacidade=None, relogio=time.monotonic):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade if capacidade is not None else max(taxa, 1))
+        self.tokens = self.capacidade
+        self._relogio = relogio
+        self._ultimo = relogio()
+        self._lock = asyncio.Lock()
+
+    def _reabastecer(self):
+        agora = self._relogio()
+        self.tokens = min(self.capacidade, self.tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    async def adquirir(self):
+        async with self._lock:
+            self._reabastecer()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.taxa)
+                self._reabastecer()
+            self.tokens -= 1
+
+
+def erro_transitorio(erro):
+    """Indica se o erro é de limite de taxa/timeout e vale nova tentativa"""
+    if isinstance(erro, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(erro, "status_code", None) or getattr(getattr(erro, "response", None), "status_code", None)
+    if status in STATUS_TRANSITORIOS:
+        return True
+    # Exceções do SDK da OpenAI sem status (APITimeoutError, APIConnectionError)
+    return type(erro).__name__ in {"RateLimitError", "APITimeoutError", "APIConnectionError"}
+
+
+async def _invocar_com_retentativas(chain, entrada, balde, tentativas, atraso_base, atraso_maximo):
+    for tentativa in range(tentativas):
+        if balde is not None:
+            await balde.adquirir()
+        try:
+            return await chain.ainvoke(entrada)
+        except Exception as erro:
+            if tentativa == tentativas - 1 or not erro_transitorio(erro):
+                raise
+            # Backoff exponencial com jitter
+            atraso = min(atraso_maximo, atraso_base * 2 ** tentativa)
+            await asyncio.sleep(atraso * random.uniform(0.5, 1.0))
+
+
+async def categorizar_async(chain, entradas, concorrencia=8, requisicoes_por_segundo=None,
+                            tentativas=5, atraso_base=1.0, atraso_maximo=30.0, ao_concluir=None):
+    """Invoca a chain para cada entrada com concorrência limitada
+
+    `ao_concluir(indice, resultado, concluidos, total)` é chamado assim que
+    cada resultado chega, na ordem de conclusão. O retorno preserva a
+    ordem das entradas.
+    """
+    entradas = list(entradas)
+    total = len(entradas)
+    resultados = [None] * total
+    semaforo = asyncio.Semaphore(concorrencia)
+    balde = BaldeTokens(requisicoes_por_segundo) if requisicoes_por_segundo else None
+    concluidos = 0
+
+    async def tarefa(indice, entrada):
+        nonlocal concluidos
+        async with semaforo:
+            resultado = await _invocar_com_retentativas(
+                chain, entrada, balde, tentativas, atraso_base, atraso_maximo
+            )
+        resultados[indice] = resultado
+        concluidos += 1
+        if ao_concluir is not None:
+            ao_concluir(indice, resultado, concluidos, total)
+
+    await asyncio.gather(*(tarefa(i, entrada) for i, entrada in enumerate(entradas)))
+    return resultados
+
+
+def categorizar_concorrente(chain, entradas, **opcoes):
+    """Versão síncrona de `categorizar_async`, para uso no script da página"""
+    return asyncio.run(categorizar_async(chain, entradas, **opcoes))
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+# Local padrão do histórico de transações (fora do controle de versão)
+CAMINHO_ARMAZEM_PADRAO = os.path.join(".cache", "transacoes.sqlite3")
+
+
+def preencher_ids(df, contas=None):
+    """IDs ausentes ou em branco viram um hash determinístico de Data, Valor e Descrição
+
+    Lançamentos idênticos no mesmo arquivo (e na mesma conta, se `contas` for dada)
+    recebem um contador de ocorrência, então reimportar o arquivo gera os mesmos IDs
+    e a deduplicação continua valendo.
+    """
+    ids = df["ID"].astype("string").str.strip()
+    vazios = ids.isna() | (ids == "")
+    if not vazios.any():
+        return df["ID"].astype(str)
+    chaves = (
+        pd.to_datetime(df["Data"]).dt.strftime("%Y-%m-%d")
+        + "|" + pd.to_numeric(df["Valor"]).map("{:.2f}".format)
+        + "|" + df["Descrição"].astype(str).str.strip()
+    )
+    if contas is not None:
+        chaves = contas.astype(str) + "|" + chaves
+    ocorrencias = chaves.groupby(chaves).cumcount().astype(str)
+    derivados = (chaves + "|" + ocorrencias).map(
+        lambda chave: "H" + hashlib.sha1(chave.encode("utf-8")).hexdigest()[:20]
+    )
+    return ids.where(~vazios, derivados).astype(str)
+
+
+class ArmazemTransacoes:
+    """Histórico persistente (SQLite) de transações, deduplicado pelo ID (conta + FITID, no OFX)"""
+
+    def __init__(self, caminho=CAMINHO_ARMAZEM_PADRAO):
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.caminho = caminho
+        # Incrementa a cada gravação; serve de chave para caches de leitura
+        self.versao = 0
+        # Incrementa a cada limpeza; gravações de antes dela são recusadas
+        self.geracao = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transacoes (
+                id TEXT PRIMARY KEY NOT NULL,
+                data TEXT NOT NULL,
+                mes TEXT NOT NULL,
+                valor REAL NOT NULL,
+                descricao TEXT NOT NULL,
+                categoria TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_mes ON transacoes (mes)")
+        self._conn.commit()
+
+    def ids(self):
+        """Conjunto de IDs já armazenados"""
+        with self._lock:
+            return {linha[0] for linha in self._conn.execute("SELECT id FROM transacoes")}
+
+    def inserir(self, df, geracao=None):
+        """Grava transações categorizadas (Data, Valor, Descrição, ID, Categoria), ignorando IDs repetidos
+
+        Com `geracao`, nada é gravado se o histórico foi limpo depois dela (job antigo).
+        Retorna as linhas efetivamente inseridas.
+        """
+        if df.empty:
+            return df
+        # IDs repetidos dentro do mesmo arquivo são gravados uma única vez
+        df = df[~df["ID"].astype(str).duplicated()]
+        datas = pd.to_datetime(df["Data"])
+        linhas = list(zip(
+            df["ID"].astype(str),
+            datas.dt.strftime("%Y-%m-%d"),
+            datas.dt.strftime("%Y-%m"),
+            df["Valor"].astype(float),
+            df["Descrição"].astype(str),
+            df["Categoria"].astype(str),
+        ))
+        with self._lock:
+            if geracao is not None and geracao != self.geracao:
+                return df.iloc[:0]
+            existentes = set()
+            ids = [linha[0] for linha in linhas]
+            for i in range(0, len(ids), 500):
+                lote = ids[i:i + 500]
+                marcadores = ",".join("?" * len(lote))
+                existentes.update(
+                    linha[0] for linha in self._conn.execute(
+                        f"SELECT id FROM transacoes WHERE id IN ({marcadores})", lote
+                    )
+                )
+            novas = [linha for linha in linhas if linha[0] not in existentes]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO transacoes (id, data, mes, valor, descricao, categoria) VALUES (?, ?, ?, ?, ?, ?)",
+                novas,
+            )
+            self._conn.commit()
+            self.versao += 1
+        return df[~df["ID"].astype(str).isin(existentes)]
+
+    def meses(self):
+        """Meses presentes no histórico, do mais recente para o mais antigo"""
+        with self._lock:
+            return [linha[0] for linha in self._conn.execute(
+                "SELECT DISTINCT mes FROM transacoes ORDER BY mes DESC"
+            )]
+
+    def carregar_mes(self, mes):
+        """Transações de um mês, no formato do quadro do dashboard"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT id, data, valor, descricao, categoria FROM transacoes WHERE mes = ? ORDER BY data",
+                self._conn,
+                params=(mes,),
+            )
+        return self._para_quadro(df)
+
+    def carregar(self):
+        """Histórico completo, no formato do quadro do dashboard"""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT id, data, valor, descricao, categoria FROM transacoes ORDER BY data",
+                self._conn,
+            )
+        return self._para_quadro(df)
+
+    def agregado_despesas(self):
+        """Despesas agregadas por (Mês, Categoria, Data), calculadas no SQLite"""
+        with self._lock:
+            df = pd.read_sql_query(
+                """
+                SELECT mes AS "Mês", categoria AS "Categoria", data AS "Data",
+                       SUM(-valor) AS "Valor_Absoluto", COUNT(*) AS "Quantidade"
+                FROM transacoes
+                WHERE valor < 0
+                GROUP BY mes, categoria, data
+                """,
+                self._conn,
+            )
+        df["Data"] = pd.to_datetime(df["Data"])
+        return df
+
+    def limpar(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM transacoes")
+            self._conn.commit()
+            self.versao += 1
+            self.geracao += 1
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transacoes").fetchone()[0]
+
+    @staticmethod
+    def _para_quadro(df):
+        df = df.rename(columns={
+            "id": "ID",
+            "data": "Data",
+            "valor": "Valor",
+            "descricao": "Descrição",
+            "categoria": "Categoria",
+        })
+        df["Data"] = pd.to_datetime(df["Data"])
+        return df[["Data", "Valor", "Descrição", "ID", "Categoria"]]
@@ -0,0 +1,86 @@
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from financas.armazenamento import preencher_ids
+
+# Esquema do histórico rotulado (mesmo de samples/finances.csv)
+COLUNAS_HISTORICO = ["ID", "Data", "Valor", "Descrição", "Categoria"]
+
+EXTENSOES_HISTORICO = (".csv", ".parquet", ".arrow", ".feather")
+
+
+def _origem_arrow(arquivo):
+    """Caminhos são mapeados em memória; uploads viram buffers Arrow sem cópia"""
+    if isinstance(arquivo, (str, os.PathLike)):
+        return pa.memory_map(os.fspath(arquivo), "r")
+    return pa.BufferReader(pa.py_buffer(arquivo.getvalue()))
+
+
+def ler_historico(arquivo, nome=None, colunas=COLUNAS_HISTORICO):
+    """Lê histórico em CSV, Parquet ou Arrow/Feather, só com as colunas pedidas
+
+    `arquivo` pode ser um caminho ou um arquivo enviado (com .getvalue());
+    `nome` define o formato quando `arquivo` não é um caminho.
+    """
+    nome = nome or os.fspath(arquivo)
+    extensao = os.path.splitext(nome)[1].lower()
+
+    if extensao == ".csv":
+        origem = arquivo if isinstance(arquivo, (str, os.PathLike)) else io.BytesIO(arquivo.getvalue())
+        disponiveis = pd.read_csv(origem, nrows=0).columns
+        if not isinstance(arquivo, (str, os.PathLike)):
+            origem.seek(0)
+        df = pd.read_csv(
+            origem,
+            usecols=[c for c in colunas if c in disponiveis],
+            dtype={"ID": str, "Descrição": str, "Categoria": str},
+        )
+    elif extensao == ".parquet":
+        esquema = pq.read_schema(_origem_arrow(arquivo))
+        tabela = pq.read_table(
+            _origem_arrow(arquivo), columns=[c for c in colunas if c in esquema.names]
+        )
+        df = tabela.to_pandas()
+    elif extensao in (".arrow", ".feather"):
+        tabela = feather.read_table(_origem_arrow(arquivo), memory_map=False)
+        df = tabela.select([c for c in colunas if c in tabela.column_names]).to_pandas()
+    else:
+        raise ValueError(f"Formato não suportado: {extensao}")
+
+    # Colunas ausentes (ex.: Categoria em históricos sem rótulo) entram vazias
+    for coluna in colunas:
+        if coluna not in df.columns:
+            df[coluna] = None
+    if "ID" in colunas:
+        if {"Data", "Valor", "Descrição"}.issubset(df.columns):
+            df["ID"] = preencher_ids(df)
+        else:
+            df["ID"] = df["ID"].astype(str)
+    if "Data" in df.columns:
+        df["Data"] = pd.to_datetime(df["Data"])
+    return df[list(colunas)]
+
+
+def _tabela(df):
+    df = df[COLUNAS_HISTORICO].copy()
+    df["Categoria"] = df["Categoria"].astype("string")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def exportar_parquet(df):
+    """Bytes de um Parquet com o esquema do histórico"""
+    saida = pa.BufferOutputStream()
+    pq.write_table(_tabela(df), saida, compression="zstd")
+    return saida.getvalue().to_pybytes()
+
+
+def exportar_arrow(df):
+    """Bytes de um Arrow IPC (Feather v2) sem compressão, próprio para memory-map"""
+    saida = pa.BufferOutputStream()
+    feather.write_feather(_tabela(df), saida, compression="uncompressed")
+    return saida.getvalue().to_pybytes()
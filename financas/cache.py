@@ -0,0 +1,115 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Local padrão do cache em disco (fora do controle de versão)
+CAMINHO_CACHE_PADRAO = os.path.join(".cache", "categorias.sqlite3")
+
+
+def normalizar_descricao(descricao):
+    """Normaliza caixa e espaços da descrição para uso como chave do cache"""
+    return re.sub(r"\s+", " ", str(descricao)).strip().upper()
+
+
+def hash_prompt(template):
+    """Hash curto do template, para invalidar o cache quando o prompt mudar"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+class CacheCategorias:
+    """Cache persistente (SQLite) de categorias com despejo LRU por tamanho"""
+
+    def __init__(self, caminho=CAMINHO_CACHE_PADRAO, max_entradas=50000):
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.caminho = caminho
+        self.max_entradas = max_entradas
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS categorias (
+                chave TEXT PRIMARY KEY,
+                categoria TEXT NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON categorias (ultimo_acesso)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def chave(descricao, modelo, temperatura, prompt_hash):
+        """Chave de conteúdo: descrição normalizada + modelo + temperatura + prompt"""
+        bruto = "\x1f".join(
+            [normalizar_descricao(descricao), str(modelo), f"{float(temperatura):.3f}", prompt_hash]
+        )
+        return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+    def obter_varios(self, chaves):
+        """Retorna {chave: categoria} para as chaves presentes, marcando o acesso"""
+        chaves = list(dict.fromkeys(chaves))
+        encontrados = {}
+        with self._lock:
+            # SQLite limita o número de parâmetros por consulta
+            for i in range(0, len(chaves), 500):
+                lote = chaves[i:i + 500]
+                marcadores = ",".join("?" * len(lote))
+                linhas = self._conn.execute(
+                    f"SELECT chave, categoria FROM categorias WHERE chave IN ({marcadores})",
+                    lote,
+                ).fetchall()
+                encontrados.update(linhas)
+            if encontrados:
+                agora = time.time()
+                self._conn.executemany(
+                    "UPDATE categorias SET ultimo_acesso = ? WHERE chave = ?",
+                    [(agora, chave) for chave in encontrados],
+                )
+                self._conn.commit()
+            self.acertos += len(encontrados)
+            self.falhas += len(chaves) - len(encontrados)
+        return encontrados
+
+    def gravar_varios(self, itens):
+        """Grava {chave: categoria} e aplica o despejo LRU se passar do limite"""
+        if not itens:
+            return
+        agora = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO categorias (chave, categoria, ultimo_acesso) VALUES (?, ?, ?)",
+                [(chave, categoria, agora) for chave, categoria in itens.items()],
+            )
+            total = self._conn.execute("SELECT COUNT(*) FROM categorias").fetchone()[0]
+            excesso = total - self.max_entradas
+            if excesso > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM categorias WHERE chave IN (
+                        SELECT chave FROM categorias ORDER BY ultimo_acesso ASC LIMIT ?
+                    )
+                    """,
+                    (excesso,),
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM categorias").fetchone()[0]
+
+    def limpar(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM categorias")
+            self._conn.commit()
+            self.acertos = 0
+            self.falhas = 0
@@ -0,0 +1,143 @@
+from financas.agendador import categorizar_concorrente
+from financas.cache import CacheCategorias
+from financas.empacotamento import CATEGORIAS, categorizar_empacotado, validar_categoria
+from financas.jobs import JobCancelado
+from financas.normalizacao import agrupar_descricoes
+from financas.transacoes import preparar_transacoes
+from instrumentacao import perfil
+
+# A lista de categorias vem de CATEGORIAS, a mesma usada para validar as respostas
+TEMPLATE_ITEM = """
+Você é um analista de dados, trabalhando em um projeto de limpeza de dados.
+Seu trabalho é escolher uma categoria adequada para cada lançamento financeiro.
+
+Escolha uma dentre as seguintes categorias:
+""" + "\n".join(f"- {categoria}" for categoria in CATEGORIAS) + """
+
+Item a categorizar: {text}
+
+Responda apenas com o nome da categoria, sem explicações.
+"""
+
+
+@perfil.medir("categorizar_transacoes")
+def categorizar_transacoes(df, chain, chain_pacote, classificador, cache, modelo, temperatura,
+                           prompt_hash, tamanho_pacote=20, max_tokens_pacote=1500, concorrencia=8,
+                           requisicoes_por_segundo=5, ao_resolver=None):
+    """Categoriza df["Descrição"] em camadas: regras, modelo local, cache e LLM
+
+    Não usa comandos do Streamlit, então pode rodar fora da thread do script.
+    `ao_resolver(linhas)` recebe, conforme as categorias ficam prontas, as
+    linhas de df recém-categorizadas (com a coluna Categoria). Retorna df
+    com Categoria preenchida e um dicionário com quantos estabelecimentos
+    cada camada resolveu.
+    """
+    # Agrupar descrições pelo estabelecimento: cada chave única é categorizada uma vez
+    chaves_linhas, representantes = agrupar_descricoes(df["Descrição"])
+    chaves_linhas.index = df.index
+    categoria_por_chave = {}
+
+    def resolver(categorias):
+        categoria_por_chave.update(categorias)
+        if ao_resolver is not None and categorias:
+            linhas = df[chaves_linhas.isin(categorias.keys())].copy()
+            linhas["Categoria"] = chaves_linhas[linhas.index].map(categorias)
+            ao_resolver(linhas)
+
+    # Camadas locais: regras e modelo offline respondem antes do LLM
+    valores_por_chave = df["Valor"].groupby(chaves_linhas.values).first()
+    categorias_locais, camadas = classificador.classificar(
+        representantes.keys(),
+        [valores_por_chave[chave] for chave in representantes]
+    )
+    locais = {
+        chave: categoria
+        for chave, categoria in zip(representantes, categorias_locais)
+        if categoria is not None
+    }
+
+    # Consultar o cache antes de chamar o modelo
+    chaves_cache = {
+        chave: CacheCategorias.chave(chave, modelo, temperatura, prompt_hash)
+        for chave in representantes
+        if chave not in locais
+    }
+    em_cache = cache.obter_varios(chaves_cache.values())
+    resolver({
+        **locais,
+        **{chave: em_cache[chave_cache] for chave, chave_cache in chaves_cache.items() if chave_cache in em_cache},
+    })
+
+    # Apenas estabelecimentos fora do cache vão para o modelo
+    pendentes = [chave for chave in representantes if chave not in categoria_por_chave]
+
+    if pendentes:
+        # Cada resultado vai para o cache e para quem acompanha assim que chega
+        def ao_concluir(indice, categoria, concluidos, total):
+            chave = pendentes[indice]
+            categoria = validar_categoria(categoria) if categoria is not None else None
+            if categoria is None:
+                # Resposta fora das categorias permitidas: "Outros", sem gravar no cache
+                # para que o estabelecimento seja consultado de novo na próxima importação
+                resolver({chave: "Outros"})
+                return
+            cache.gravar_varios({chaves_cache[chave]: categoria})
+            resolver({chave: categoria})
+
+        opcoes = dict(
+            concorrencia=concorrencia,
+            requisicoes_por_segundo=requisicoes_por_segundo,
+            ao_concluir=ao_concluir,
+        )
+        if tamanho_pacote > 1:
+            # Vários itens por requisição, com a lista de categorias enviada uma vez
+            categorizar_empacotado(
+                chain_pacote,
+                chain,
+                [representantes[chave] for chave in pendentes],
+                tamanho_pacote=tamanho_pacote,
+                max_tokens=max_tokens_pacote,
+                **opcoes
+            )
+        else:
+            categorizar_concorrente(chain, [representantes[chave] for chave in pendentes], **opcoes)
+
+    # Propagar a categoria de cada estabelecimento para todas as suas linhas
+    df["Categoria"] = chaves_linhas.map(categoria_por_chave).values
+    resolvidos_regra = camadas.count("regra")
+    resolvidos_modelo = camadas.count("modelo")
+    estatisticas = {
+        "transacoes": len(df),
+        "estabelecimentos": len(representantes),
+        "regra": resolvidos_regra,
+        "modelo": resolvidos_modelo,
+        "cache": len(representantes) - resolvidos_regra - resolvidos_modelo - len(pendentes),
+        "llm": len(pendentes),
+    }
+    return df, estatisticas
+
+
+def importar_transacoes(job, df, armazem, cubo, **config):
+    """Categoriza e grava no histórico, com resultados parciais a cada categoria pronta
+
+    Pensada para rodar num RegistroJobs: o progresso vai para `job`. Se o job for
+    cancelado ou o histórico for limpo no meio, para sem gravar mais nada.
+    """
+    inseridas = 0
+    geracao = armazem.geracao
+
+    def gravar_parcial(linhas):
+        nonlocal inseridas
+        if job.cancelado or armazem.geracao != geracao:
+            raise JobCancelado()
+        novas = armazem.inserir(linhas, geracao=geracao)
+        if not novas.empty:
+            _, novas_despesas = preparar_transacoes(novas.copy())
+            cubo.acrescentar(novas_despesas)
+        inseridas += len(novas)
+        job.avancar(len(linhas))
+
+    job.total = len(df)
+    _, estatisticas = categorizar_transacoes(df, ao_resolver=gravar_parcial, **config)
+    estatisticas["inseridas"] = inseridas
+    return estatisticas
@@ -0,0 +1,89 @@
+import re
+
+from financas.normalizacao import chave_estabelecimento
+
+# Regras padrão: (padrão regex sobre a chave do estabelecimento, categoria, sinal do valor)
+# sinal: "+" só para entradas, "-" só para saídas, None para ambos
+REGRAS_PADRAO = [
+    (r"\bRECEBID[OA]\b|TRANSF\.?ELETR\.?DISPONIV", "Receitas", "+"),
+    (r"\bUBER\b|\b99\s?(?:APP|TAXI|POP)\b|\bPOP\b|ESTACION|METAPARK|SEM PARAR", "Transporte", "-"),
+    (r"PAGAMENTO DE TELEFONE|\bTIM SA\b|\bCLARO\b|\bVIVO\b", "Telefone", "-"),
+    (r"PAGAMENTO DE BOLETO - .*IMOVEIS|\bALUGUEL\b|\bCONDOMINIO\b", "Moradia", "-"),
+    (r"\bUNIMED\b|\bHOSPITAL\b|\bPANVEL\b|\bDROGA(?:RIA|SIL)\b|\bRAIA\b", "Saúde", "-"),
+    (r"\bESCOLA\b|\bLIVRARIA\b|\bCURSO\b|\bFACULDADE\b", "Educação", "-"),
+]
+
+# Confiança mínima para aceitar a resposta do modelo local
+LIMIAR_CONFIANCA_PADRAO = 0.8
+
+
+class ClassificadorLocal:
+    """Classificador em camadas: regras regex/palavra-chave e depois modelo TF-IDF"""
+
+    def __init__(self, regras=None, limiar=LIMIAR_CONFIANCA_PADRAO):
+        regras = REGRAS_PADRAO if regras is None else regras
+        self.regras = [(re.compile(padrao, re.IGNORECASE), categoria, sinal) for padrao, categoria, sinal in regras]
+        self.limiar = limiar
+        self.modelo = None
+
+    def treinar(self, descricoes, categorias):
+        """Treina o modelo local com histórico rotulado (Descrição, Categoria)"""
+        # Importado só aqui: o scikit-learn é pesado e só é necessário ao treinar
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.pipeline import make_pipeline
+        except ImportError:  # modelo local é opcional; sem ele só as regras são usadas
+            return self
+        chaves = [chave_estabelecimento(d) for d in descricoes]
+        categorias = list(categorias)
+        if len(set(categorias)) < 2:
+            return self
+        self.modelo = make_pipeline(
+            TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True),
+            LogisticRegression(max_iter=1000, C=10.0),
+        )
+        self.modelo.fit(chaves, categorias)
+        return self
+
+    def aplicar_regras(self, chave, valor=None):
+        for padrao, categoria, sinal in self.regras:
+            if sinal == "+" and valor is not None and valor <= 0:
+                continue
+            if sinal == "-" and valor is not None and valor >= 0:
+                continue
+            if padrao.search(chave):
+                return categoria
+        return None
+
+    def classificar(self, chaves, valores=None):
+        """Classifica chaves de estabelecimento
+
+        Retorna duas listas alinhadas às chaves: a categoria (None quando
+        nenhuma camada local tem confiança suficiente) e a camada que
+        respondeu ("regra", "modelo" ou None).
+        """
+        chaves = list(chaves)
+        valores = list(valores) if valores is not None else [None] * len(chaves)
+        categorias = [None] * len(chaves)
+        camadas = [None] * len(chaves)
+
+        restantes = []
+        for i, (chave, valor) in enumerate(zip(chaves, valores)):
+            categoria = self.aplicar_regras(chave, valor)
+            if categoria is not None:
+                categorias[i] = categoria
+                camadas[i] = "regra"
+            else:
+                restantes.append(i)
+
+        if self.modelo is not None and restantes:
+            probabilidades = self.modelo.predict_proba([chaves[i] for i in restantes])
+            classes = self.modelo.classes_
+            for i, linha in zip(restantes, probabilidades):
+                melhor = linha.argmax()
+                if linha[melhor] >= self.limiar:
+                    categorias[i] = classes[melhor]
+                    camadas[i] = "modelo"
+
+        return categorias, camadas
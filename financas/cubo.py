@@ -0,0 +1,114 @@
+import threading
+
+import pandas as pd
+
+_COLUNAS = ["Categoria", "Data", "Valor_Absoluto", "Quantidade"]
+
+
+def _agregar(df_despesas):
+    """Totais e contagens por (Mês, Categoria, Data)"""
+    agregado = (
+        df_despesas.groupby(["Mês", "Categoria", "Data"], observed=True)["Valor_Absoluto"]
+        .agg(["sum", "count"])
+        .reset_index()
+        .rename(columns={"sum": "Valor_Absoluto", "count": "Quantidade"})
+    )
+    agregado["Mês"] = agregado["Mês"].astype(str)
+    agregado["Categoria"] = agregado["Categoria"].astype(str)
+    return agregado
+
+
+class CuboGastos:
+    """Cubo pré-agregado de despesas: mês × categoria × dia, com total e quantidade
+
+    Cada mês fica numa tabela própria de no máximo dias × categorias
+    linhas, então as consultas do dashboard não crescem com o histórico.
+    """
+
+    def __init__(self):
+        self._por_mes = {}
+        self.categorias = []
+        # Jobs em segundo plano acrescentam enquanto o script lê
+        self._lock = threading.Lock()
+
+    @classmethod
+    def construir(cls, df_despesas):
+        cubo = cls()
+        cubo.acrescentar(df_despesas)
+        return cubo
+
+    @classmethod
+    def de_agregado(cls, agregado):
+        """Cubo a partir de totais já agregados (Mês, Categoria, Data, Valor_Absoluto, Quantidade)"""
+        cubo = cls()
+        cubo._somar(agregado)
+        return cubo
+
+    def acrescentar(self, df_despesas):
+        """Soma novas despesas ao cubo, recalculando só os meses afetados"""
+        if df_despesas.empty:
+            return self
+        return self._somar(_agregar(df_despesas))
+
+    def _somar(self, agregado):
+        if agregado.empty:
+            return self
+        with self._lock:
+            for mes, novos in agregado.groupby("Mês", sort=False):
+                novos = novos[_COLUNAS]
+                atual = self._por_mes.get(mes)
+                if atual is not None:
+                    novos = (
+                        pd.concat([atual, novos])
+                        .groupby(["Categoria", "Data"], as_index=False)[["Valor_Absoluto", "Quantidade"]]
+                        .sum()
+                    )
+                self._por_mes[mes] = novos.reset_index(drop=True)
+            self.categorias = sorted(
+                set(self.categorias).union(*(set(f["Categoria"]) for f in self._por_mes.values()))
+            )
+        return self
+
+    @property
+    def meses(self):
+        return sorted(self._por_mes, reverse=True)
+
+    def fatia(self, mes, categorias=None):
+        """Linhas do cubo para o mês, opcionalmente restritas às categorias"""
+        with self._lock:
+            fatia = self._por_mes.get(mes)
+        if fatia is None:
+            return pd.DataFrame(columns=_COLUNAS)
+        if categorias:
+            fatia = fatia[fatia["Categoria"].isin(categorias)]
+        return fatia
+
+    def por_categoria(self, mes, categorias=None):
+        return (
+            self.fatia(mes, categorias)
+            .groupby("Categoria", as_index=False)[["Valor_Absoluto", "Quantidade"]]
+            .sum()
+        )
+
+    def por_dia(self, mes, categorias=None):
+        return (
+            self.fatia(mes, categorias)
+            .groupby("Data", as_index=False)[["Valor_Absoluto", "Quantidade"]]
+            .sum()
+        )
+
+    def metricas(self, mes, categorias=None):
+        """Total, quantidade, média e maior categoria do mês (None se vazio)"""
+        por_categoria = self.por_categoria(mes, categorias)
+        if por_categoria.empty:
+            return None
+        total = por_categoria["Valor_Absoluto"].sum()
+        quantidade = int(por_categoria["Quantidade"].sum())
+        maior = por_categoria.loc[por_categoria["Valor_Absoluto"].idxmax()]
+        return {
+            "total": total,
+            "quantidade": quantidade,
+            "media": total / quantidade if quantidade else 0,
+            "maior_categoria": maior["Categoria"],
+            "maior_valor": maior["Valor_Absoluto"],
+        }
@@ -0,0 +1,149 @@
+import json
+import re
+
+from financas.agendador import categorizar_concorrente
+
+CATEGORIAS = [
+    "Alimentação",
+    "Receitas",
+    "Saúde",
+    "Mercado",
+    "Educação",
+    "Compras",
+    "Transporte",
+    "Investimento",
+    "Transferências para terceiros",
+    "Telefone",
+    "Moradia",
+    "Lazer",
+    "Serviços",
+    "Outros",
+]
+
+TEMPLATE_PACOTE = """
+Você é um analista de dados, trabalhando em um projeto de limpeza de dados.
+Seu trabalho é escolher uma categoria adequada para cada lançamento financeiro.
+
+Categorias permitidas:
+{categorias}
+
+Itens a categorizar ({quantidade}), um por linha, no formato "número. descrição":
+{itens}
+
+Responda apenas com um array JSON de {quantidade} strings, na mesma ordem dos itens,
+contendo somente nomes de categorias da lista. Exemplo: ["Alimentação", "Receitas"]
+"""
+
+
+def estimar_tokens(texto):
+    """Estimativa grosseira de tokens (~4 caracteres por token)"""
+    return len(texto) // 4 + 1
+
+
+def montar_pacotes(descricoes, tamanho_pacote=20, max_tokens=1500):
+    """Divide as descrições em pacotes de até `tamanho_pacote` itens e `max_tokens` tokens"""
+    pacotes = []
+    atual, tokens_atual = [], 0
+    for indice, descricao in enumerate(descricoes):
+        # Cada item custa a descrição mais a numeração e a resposta esperada
+        tokens = estimar_tokens(descricao) + 8
+        if atual and (len(atual) >= tamanho_pacote or tokens_atual + tokens > max_tokens):
+            pacotes.append(atual)
+            atual, tokens_atual = [], 0
+        atual.append(indice)
+        tokens_atual += tokens
+    if atual:
+        pacotes.append(atual)
+    return pacotes
+
+
+def entrada_pacote(descricoes):
+    """Variáveis do TEMPLATE_PACOTE para uma lista de descrições"""
+    return {
+        "categorias": "\n".join(f"- {categoria}" for categoria in CATEGORIAS),
+        "quantidade": len(descricoes),
+        "itens": "\n".join(f"{i + 1}. {descricao}" for i, descricao in enumerate(descricoes)),
+    }
+
+
+def validar_categoria(texto, categorias_validas=CATEGORIAS):
+    """Nome canônico da categoria respondida pelo modelo, ou None se estiver fora do conjunto permitido"""
+    por_nome = {categoria.casefold(): categoria for categoria in categorias_validas}
+    # Respostas de item único às vezes vêm com aspas ou ponto final
+    return por_nome.get(str(texto).strip().strip("\"'.").strip().casefold())
+
+
+def interpretar_resposta(texto, quantidade, categorias_validas=CATEGORIAS):
+    """Extrai a lista de categorias da resposta JSON do modelo
+
+    Retorna uma lista com `quantidade` posições; entradas ausentes ou fora
+    do conjunto permitido ficam como None.
+    """
+    por_nome = {categoria.casefold(): categoria for categoria in categorias_validas}
+    resultado = [None] * quantidade
+
+    # Modelos costumam envolver o JSON em ```json ... ```
+    encontrado = re.search(r"\[.*\]", str(texto), re.DOTALL)
+    if not encontrado:
+        return resultado
+    try:
+        itens = json.loads(encontrado.group(0))
+    except ValueError:
+        return resultado
+    if not isinstance(itens, list):
+        return resultado
+
+    for i, item in enumerate(itens[:quantidade]):
+        if isinstance(item, dict):
+            item = item.get("categoria")
+        if isinstance(item, str):
+            resultado[i] = por_nome.get(item.strip().casefold())
+    return resultado
+
+
+def categorizar_empacotado(chain_pacote, chain_item, descricoes, tamanho_pacote=20,
+                           max_tokens=1500, ao_concluir=None, **opcoes):
+    """Categoriza em pacotes de N itens, com chamadas individuais para entradas inválidas
+
+    Respostas que continuam fora de CATEGORIAS depois da chamada individual ficam como None.
+
+    `ao_concluir(indice, categoria, concluidos, total)` segue o contrato de
+    `categorizar_async`, por item. As demais opções vão para o agendador.
+    """
+    descricoes = list(descricoes)
+    total = len(descricoes)
+    categorias = [None] * total
+    concluidos = 0
+
+    def registrar(indice, categoria):
+        nonlocal concluidos
+        categorias[indice] = categoria
+        concluidos += 1
+        if ao_concluir is not None:
+            ao_concluir(indice, categoria, concluidos, total)
+
+    pacotes = montar_pacotes(descricoes, tamanho_pacote, max_tokens)
+
+    def pacote_concluido(indice_pacote, resposta, *_):
+        indices = pacotes[indice_pacote]
+        for indice, categoria in zip(indices, interpretar_resposta(resposta, len(indices))):
+            if categoria is not None:
+                registrar(indice, categoria)
+
+    categorizar_concorrente(
+        chain_pacote,
+        [entrada_pacote([descricoes[i] for i in indices]) for indices in pacotes],
+        ao_concluir=pacote_concluido,
+        **opcoes
+    )
+
+    # Entradas malformadas voltam para o prompt de item único
+    faltantes = [i for i, categoria in enumerate(categorias) if categoria is None]
+    if faltantes:
+        categorizar_concorrente(
+            chain_item,
+            [descricoes[i] for i in faltantes],
+            ao_concluir=lambda j, categoria, *_: registrar(faltantes[j], validar_categoria(categoria)),
+            **opcoes
+        )
+    return categorias
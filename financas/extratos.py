@@ -0,0 +1,50 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def hash_conteudo(conteudo):
+    """Hash SHA-256 do conteúdo do arquivo enviado"""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+class CacheExtratos:
+    """Cache em memória de extratos já processados, por hash do arquivo, com TTL e LRU"""
+
+    def __init__(self, max_entradas=16, ttl=6 * 60 * 60, relogio=time.monotonic):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._relogio = relogio
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            gravado_em, valor = item
+            if self.ttl is not None and self._relogio() - gravado_em > self.ttl:
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def gravar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (self._relogio(), valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_entradas:
+                self._itens.popitem(last=False)
+
+    def remover(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
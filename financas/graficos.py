@@ -0,0 +1,151 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from instrumentacao import perfil
+
+# Acima deste número de pontos a linha do tempo é reduzida e desenhada em WebGL
+MAX_PONTOS_LINHA = 500
+
+_HOVER_PIZZA = '<b>%{label}</b><br>R$ %{value:,.2f}<br>%{percent}'
+
+
+def impressao_digital(dados):
+    """Hash do conteúdo do DataFrame agregado (valores e nomes de colunas)"""
+    hashes = pd.util.hash_pandas_object(dados, index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes() + "|".join(map(str, dados.columns)).encode("utf-8")).hexdigest()
+
+
+def figura_pizza(dados):
+    fig = px.pie(
+        dados,
+        values='Valor_Absoluto',
+        names='Categoria',
+        title='<b>Distribuição em Pizza</b>',
+        hole=0.3,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate=_HOVER_PIZZA
+    )
+    fig.update_layout(
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def figura_rosca(dados, pizza):
+    """Rosca derivada da pizza já montada, sem refazer o px.pie"""
+    fig = go.Figure(pizza)
+    cores = px.colors.qualitative.Pastel
+    fig.update_traces(
+        hole=0.6,
+        textposition='outside',
+        marker=dict(colors=[cores[i % len(cores)] for i in range(len(dados))])
+    )
+    fig.update_layout(title_text='<b>Visão em Rosca</b>')
+    return fig
+
+
+def figura_barras(dados):
+    fig = px.bar(
+        dados.sort_values('Valor_Absoluto', ascending=True),
+        y='Categoria',
+        x='Valor_Absoluto',
+        title='<b>Distribuição em Barras</b>',
+        color='Valor_Absoluto',
+        color_continuous_scale='Blues',
+        orientation='h'
+    )
+    fig.update_layout(
+        height=400,
+        xaxis_title="Valor (R$)",
+        yaxis_title="",
+        showlegend=False
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{y}</b><br>R$ %{x:,.2f}'
+    )
+    return fig
+
+
+def reduzir_pontos(dados, max_pontos=MAX_PONTOS_LINHA):
+    """Soma a série diária em até `max_pontos` intervalos de tempo iguais"""
+    if len(dados) <= max_pontos:
+        return dados
+    intervalos = pd.cut(dados["Data"], bins=max_pontos)
+    reduzido = dados.groupby(intervalos, observed=True).agg(
+        Data=("Data", "first"), Valor_Absoluto=("Valor_Absoluto", "sum")
+    )
+    return reduzido.reset_index(drop=True)
+
+
+def figura_linha(dados, max_pontos=MAX_PONTOS_LINHA):
+    longa = len(dados) > max_pontos
+    fig = px.line(
+        reduzir_pontos(dados, max_pontos),
+        x='Data',
+        y='Valor_Absoluto',
+        title='<b>Gastos ao Longo do Tempo</b>',
+        markers=not longa,
+        # scattergl não suporta spline; históricos longos usam linha reta em WebGL
+        line_shape='linear' if longa else 'spline',
+        render_mode='webgl' if longa else 'auto'
+    )
+    fig.update_layout(
+        xaxis_title="Data",
+        yaxis_title="Valor (R$)",
+        hovermode='x unified'
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{x}</b><br>R$ %{y:,.2f}',
+        line=dict(width=3)
+    )
+    return fig
+
+
+class FabricaFiguras:
+    """Memoiza figuras por (tipo de gráfico, impressão digital dos dados), com LRU"""
+
+    _CONSTRUTORES = {
+        "pizza": figura_pizza,
+        "barras": figura_barras,
+        "linha": figura_linha,
+    }
+
+    def __init__(self, max_entradas=64):
+        self.max_entradas = max_entradas
+        self.acertos = 0
+        self.falhas = 0
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def figura(self, tipo, dados):
+        chave = (tipo, impressao_digital(dados))
+        with self._lock:
+            if chave in self._figuras:
+                self._figuras.move_to_end(chave)
+                self.acertos += 1
+                perfil.contar("figuras.acertos")
+                return self._figuras[chave]
+            self.falhas += 1
+        perfil.contar("figuras.falhas")
+
+        with perfil.span(f"grafico.{tipo}"):
+            if tipo == "rosca":
+                fig = figura_rosca(dados, self.figura("pizza", dados))
+            else:
+                fig = self._CONSTRUTORES[tipo](dados)
+
+        with self._lock:
+            self._figuras[chave] = fig
+            while len(self._figuras) > self.max_entradas:
+                self._figuras.popitem(last=False)
+        return fig
@@ -0,0 +1,103 @@
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+EXECUTANDO = "executando"
+CONCLUIDO = "concluído"
+ERRO = "erro"
+CANCELADO = "cancelado"
+
+
+class JobCancelado(Exception):
+    """Levantada pela função do job ao perceber que ele foi cancelado"""
+
+
+class Job:
+    """Tarefa em segundo plano com progresso consultável a cada rerun"""
+
+    def __init__(self, id_job):
+        self.id = id_job
+        self.status = EXECUTANDO
+        self.total = 0
+        self.concluidos = 0
+        self.resultado = None
+        self.erro = None
+        self.iniciado_em = time.time()
+        self.terminado_em = None
+        # Pedido de cancelamento: a função do job consulta e para de gravar
+        self.cancelado = False
+        self._lock = threading.Lock()
+
+    def cancelar(self):
+        self.cancelado = True
+
+    def avancar(self, quantidade=1):
+        with self._lock:
+            self.concluidos += quantidade
+
+    @property
+    def progresso(self):
+        return min(self.concluidos / self.total, 1.0) if self.total else 0.0
+
+    @property
+    def ativo(self):
+        return self.status == EXECUTANDO
+
+
+class RegistroJobs:
+    """Pool de threads com registro de jobs por id, para reanexar em reruns e sessões"""
+
+    def __init__(self, max_workers=2, max_jobs=32):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, id_job):
+        with self._lock:
+            return self._jobs.get(id_job)
+
+    def iniciar(self, id_job, funcao, *args, **kwargs):
+        """Inicia `funcao(job, *args, **kwargs)`; se já existe job ativo ou concluído com o id, devolve ele"""
+        with self._lock:
+            existente = self._jobs.get(id_job)
+            if existente is not None and existente.status != ERRO:
+                return existente
+            job = Job(id_job)
+            self._jobs[id_job] = job
+            self._descartar_antigos()
+        self._executor.submit(self._executar, job, funcao, args, kwargs)
+        return job
+
+    def limpar(self):
+        """Esquece todos os jobs; os que ainda estão rodando são cancelados"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.ativo:
+                    job.cancelar()
+            self._jobs.clear()
+
+    def _executar(self, job, funcao, args, kwargs):
+        try:
+            job.resultado = funcao(job, *args, **kwargs)
+            job.status = CONCLUIDO
+        except JobCancelado:
+            job.status = CANCELADO
+        except Exception as erro:
+            job.erro = f"{erro}"
+            job.detalhes = traceback.format_exc()
+            job.status = ERRO
+        finally:
+            job.terminado_em = time.time()
+
+    def _descartar_antigos(self):
+        # Remove os jobs terminados mais antigos; os ativos nunca são descartados
+        while len(self._jobs) > self.max_jobs:
+            for id_job, job in self._jobs.items():
+                if not job.ativo:
+                    del self._jobs[id_job]
+                    break
+            else:
+                return
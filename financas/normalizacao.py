@@ -0,0 +1,49 @@
+import re
+
+import pandas as pd
+
+# Tokens voláteis que mudam a cada lançamento do mesmo estabelecimento
+_PADROES_VOLATEIS = [
+    r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b",   # datas: 31/08, 07/06/2024
+    r"\b\d{1,2}:\d{2}(?::\d{2})?\b",        # horários: 18:35
+    r"\b\d{1,2}H\d{2}(?:MIN)?\b",           # horários: 06h07min (texto já em maiúsculas)
+    r"\b\d{1,2}(?:JAN|FEV|FEB|MAR|ABR|APR|MAI|MAY|JUN|JUL|AGO|AUG|SET|SEP|OUT|OCT|NOV|DEZ|DEC)\b",
+    r"\b\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b",  # CNPJ formatado ou não
+    r"\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b",         # CPF formatado ou não
+    r"\*{2,}\s*\d{2,4}\b",                       # cartão mascarado: ****1234
+    r"\bFINAL\s+\d{4}\b",                        # cartão: FINAL 1234
+    r"\b\d{3,}\b",                               # códigos numéricos soltos (agência, conta, NSU)
+]
+_REGEX_VOLATEIS = re.compile("|".join(f"(?:{p})" for p in _PADROES_VOLATEIS))
+_REGEX_SEPARADORES = re.compile(r"(?:\s*-\s*)+(?=\s*-|$)|^\s*-\s*")
+_REGEX_ESPACOS = re.compile(r"\s+")
+
+
+def chave_estabelecimento(descricao):
+    """Chave canônica do estabelecimento, sem datas, horários, CNPJ/CPF e finais de cartão"""
+    texto = _REGEX_ESPACOS.sub(" ", str(descricao)).upper()
+    texto = _REGEX_VOLATEIS.sub(" ", texto)
+    texto = _REGEX_ESPACOS.sub(" ", texto)
+    texto = _REGEX_SEPARADORES.sub("", texto.strip())
+    return texto.strip() or str(descricao).strip().upper()
+
+
+def agrupar_descricoes(descricoes):
+    """Agrupa descrições pela chave do estabelecimento
+
+    Retorna a série de chaves (alinhada às linhas) e um dicionário
+    {chave: descrição representante} com uma entrada por chave única.
+    """
+    descricoes = pd.Series(descricoes).astype(str)
+    # Descrições idênticas são normalizadas uma única vez
+    unicas = descricoes.drop_duplicates()
+    chaves_unicas = pd.Series(
+        [chave_estabelecimento(d) for d in unicas], index=unicas.values
+    )
+    chaves = descricoes.map(chaves_unicas)
+    # A primeira descrição de cada grupo é a que vai para o modelo
+    representantes = {
+        chave: descricao
+        for descricao, chave in reversed(list(zip(chaves_unicas.index, chaves_unicas.values)))
+    }
+    return chaves, representantes
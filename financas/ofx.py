@@ -0,0 +1,145 @@
+import codecs
+import html
+import re
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from financas.armazenamento import preencher_ids
+
+TAMANHO_BLOCO = 1 << 20  # 1 MiB por leitura
+
+_REGEX_TRANSACAO = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.DOTALL | re.IGNORECASE)
+# Conta do extrato (FITID só é único dentro da conta); o valor precisa terminar antes do corte do bloco
+_REGEX_CONTA = re.compile(r"<(?:BANK|CC)ACCTFROM>(?:(?!<STMTTRN>).)*?<ACCTID>([^<\r\n]*)(?=[<\r\n])", re.DOTALL | re.IGNORECASE)
+_REGEX_BLOCO = re.compile(_REGEX_CONTA.pattern + "|" + _REGEX_TRANSACAO.pattern, re.DOTALL | re.IGNORECASE)
+_REGEX_CAMPO = re.compile(r"<(DTPOSTED|TRNAMT|FITID|MEMO|NAME)>([^<\r\n]*)", re.IGNORECASE)
+_REGEX_ENCODING_XML = re.compile(rb"<\?xml[^>]*encoding=[\"']([\w.-]+)[\"']", re.IGNORECASE)
+_REGEX_CHARSET_SGML = re.compile(rb"CHARSET:\s*([\w-]+)", re.IGNORECASE)
+_REGEX_ENCODING_SGML = re.compile(rb"ENCODING:\s*([\w-]+)", re.IGNORECASE)
+
+# Valores de CHARSET do cabeçalho SGML (OFX 1.x) e o codec correspondente
+_CHARSETS = {
+    "1252": "cp1252",
+    "ISO-8859-1": "iso-8859-1",
+    "8859-1": "iso-8859-1",
+    "UTF-8": "utf-8",
+}
+
+
+def detectar_encoding(cabecalho):
+    """Detecta o encoding pelo cabeçalho OFX (XML ou SGML), com fallback para UTF-8/CP1252"""
+    encontrado = _REGEX_ENCODING_XML.search(cabecalho)
+    if encontrado:
+        return encontrado.group(1).decode("ascii")
+    encoding = _REGEX_ENCODING_SGML.search(cabecalho)
+    if encoding and encoding.group(1).upper() in (b"UTF-8", b"UNICODE"):
+        return "utf-8"
+    charset = _REGEX_CHARSET_SGML.search(cabecalho)
+    if charset:
+        codec = _CHARSETS.get(charset.group(1).decode("ascii").upper())
+        if codec:
+            return codec
+    # XML (OFX 2.x) sem atributo encoding é UTF-8 por definição
+    if cabecalho.lstrip().startswith(b"<?xml"):
+        return "utf-8"
+    # Decodificador incremental: um caractere multibyte cortado no fim da amostra não é erro
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(cabecalho)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+def iterar_transacoes(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    """Percorre os blocos <STMTTRN> incrementalmente, sem montar a árvore do OFX
+
+    Gera dicionários com os campos brutos (DTPOSTED, TRNAMT, FITID, MEMO, NAME) e o
+    ACCTID da conta do extrato em que a transação aparece ("" se o arquivo não informa).
+    """
+    primeiro = arquivo.read(tamanho_bloco)
+    encoding = detectar_encoding(primeiro[:4096])
+    try:
+        decodificador = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        decodificador = codecs.getincrementaldecoder("cp1252")(errors="replace")
+
+    conta = ""
+    buffer = ""
+    bloco = primeiro
+    while bloco:
+        buffer += decodificador.decode(bloco)
+        fim = 0
+        for encontrado in _REGEX_BLOCO.finditer(buffer):
+            fim = encontrado.end()
+            if encontrado.group(1) is not None:
+                conta = encontrado.group(1).strip()
+                continue
+            yield _campos(encontrado.group(2), conta)
+        # Mantém apenas o trecho após o último bloco completo, a partir do primeiro bloco ainda aberto
+        buffer = buffer[fim:]
+        maiusculas = buffer.upper()
+        aberturas = [i for i in (maiusculas.find(tag) for tag in _ABERTURAS) if i >= 0]
+        buffer = buffer[min(aberturas):] if aberturas else buffer[-16:]
+        bloco = arquivo.read(tamanho_bloco)
+    buffer += decodificador.decode(b"", final=True)
+    for encontrado in _REGEX_BLOCO.finditer(buffer):
+        if encontrado.group(1) is not None:
+            conta = encontrado.group(1).strip()
+            continue
+        yield _campos(encontrado.group(2), conta)
+
+
+_ABERTURAS = ("<STMTTRN>", "<BANKACCTFROM>", "<CCACCTFROM>")
+
+
+def _campos(corpo, conta):
+    campos = {campo.upper(): valor.strip() for campo, valor in _REGEX_CAMPO.findall(corpo)}
+    campos["ACCTID"] = conta
+    return campos
+
+
+def id_transacao(campos):
+    """ID no histórico: FITID prefixado pela conta ("conta:FITID"), ou None sem FITID"""
+    fitid = campos.get("FITID")
+    if not fitid:
+        return None
+    return f"{campos['ACCTID']}:{fitid}" if campos.get("ACCTID") else fitid
+
+
+def ler_ofx(arquivo, tamanho_bloco=TAMANHO_BLOCO, ignorar_ids=None):
+    """Lê um OFX/QFX (objeto binário com .read) direto para um DataFrame colunar
+
+    Transações cujo ID (ver `id_transacao`) está em `ignorar_ids` são descartadas sem
+    serem convertidas. Sem FITID, o ID é derivado de Data, Valor e Descrição (e da conta).
+    """
+    datas = []
+    valores = array("d")
+    descricoes = []
+    ids = []
+    contas = []
+    for campos in iterar_transacoes(arquivo, tamanho_bloco):
+        id_ofx = id_transacao(campos)
+        if ignorar_ids and id_ofx in ignorar_ids:
+            continue
+        datas.append(campos.get("DTPOSTED", "")[:8])
+        valores.append(float(campos.get("TRNAMT", "0").replace(",", ".")))
+        descricoes.append(html.unescape(campos.get("MEMO") or campos.get("NAME") or ""))
+        ids.append(id_ofx)
+        contas.append(campos["ACCTID"])
+
+    df = pd.DataFrame({
+        "Data": pd.to_datetime(pd.Series(datas, dtype=object), format="%Y%m%d"),
+        "Valor": np.frombuffer(valores, dtype="float64"),
+        "Descrição": descricoes,
+        "ID": ids,
+    })
+    sem_fitid = df["ID"].isna()
+    if sem_fitid.any():
+        contas = pd.Series(contas, index=df.index)[sem_fitid]
+        derivados = preencher_ids(df[sem_fitid], contas)
+        df.loc[sem_fitid, "ID"] = derivados.where(contas == "", contas + ":" + derivados)
+        if ignorar_ids:
+            df = df[~df["ID"].isin(ignorar_ids)].reset_index(drop=True)
+    return df
@@ -0,0 +1,63 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+TAMANHO_PAGINA_PADRAO = 50
+
+_REGEX_TOKEN = re.compile(r"\w+")
+
+
+def tokenizar(texto):
+    """Tokens em maiúsculas e sem acentos"""
+    sem_acentos = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return _REGEX_TOKEN.findall(sem_acentos.upper())
+
+
+class IndiceTokens:
+    """Índice invertido token -> rótulos de linha, com busca por prefixo"""
+
+    def __init__(self, descricoes):
+        postings = {}
+        for rotulo, descricao in descricoes.items():
+            for token in set(tokenizar(descricao)):
+                postings.setdefault(token, []).append(rotulo)
+        self._tokens = sorted(postings)
+        self._postings = [np.asarray(postings[token]) for token in self._tokens]
+
+    def _buscar_prefixo(self, prefixo):
+        inicio = bisect.bisect_left(self._tokens, prefixo)
+        fim = bisect.bisect_left(self._tokens, prefixo + "￿")
+        if inicio == fim:
+            return np.asarray([])
+        return np.unique(np.concatenate(self._postings[inicio:fim]))
+
+    def buscar(self, consulta):
+        """Rótulos das linhas que contêm todos os termos (por prefixo); None se a consulta é vazia"""
+        termos = tokenizar(consulta)
+        if not termos:
+            return None
+        resultado = self._buscar_prefixo(termos[0])
+        for termo in termos[1:]:
+            resultado = np.intersect1d(resultado, self._buscar_prefixo(termo))
+        return resultado
+
+
+def pagina_transacoes(df, pagina=1, tamanho=TAMANHO_PAGINA_PADRAO, ordenar_por="Data",
+                      ascendente=False, rotulos=None):
+    """Ordena no servidor e devolve só a página pedida
+
+    Retorna (linhas da página, total de linhas, número de páginas, página
+    efetiva), com a página limitada ao intervalo válido.
+    """
+    if rotulos is not None:
+        df = df[df.index.isin(rotulos)]
+    total = len(df)
+    total_paginas = max(1, -(-total // tamanho))
+    pagina = min(max(1, int(pagina)), total_paginas)
+    ordem = np.argsort(df[ordenar_por].to_numpy(), kind="stable")
+    if not ascendente:
+        ordem = ordem[::-1]
+    inicio = (pagina - 1) * tamanho
+    return df.iloc[ordem[inicio:inicio + tamanho]], total, total_paginas, pagina
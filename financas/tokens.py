@@ -0,0 +1,33 @@
+import threading
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class ContadorTokens(BaseCallbackHandler):
+    """Soma os tokens informados pelo provedor em cada resposta do modelo (todas as threads)"""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.prompt = 0
+        self.resposta = 0
+        self._lock = threading.Lock()
+
+    def on_llm_end(self, response, **kwargs):
+        uso = (response.llm_output or {}).get("token_usage") or {}
+        prompt = uso.get("prompt_tokens", 0)
+        resposta = uso.get("completion_tokens", 0)
+        if not uso:
+            # Alguns provedores só preenchem usage_metadata na mensagem
+            for geracoes in response.generations:
+                for geracao in geracoes:
+                    metadados = getattr(getattr(geracao, "message", None), "usage_metadata", None) or {}
+                    prompt += metadados.get("input_tokens", 0)
+                    resposta += metadados.get("output_tokens", 0)
+        with self._lock:
+            self.chamadas += 1
+            self.prompt += prompt
+            self.resposta += resposta
+
+    def totais(self):
+        with self._lock:
+            return {"chamadas": self.chamadas, "prompt": self.prompt, "resposta": self.resposta, "total": self.prompt + self.resposta}
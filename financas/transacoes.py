@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+
+def preparar_transacoes(df):
+    """Tipa o quadro de transações e deriva Mês/Tipo de forma vetorizada
+
+    Data vira datetime64, Mês/Tipo/Categoria viram categóricos. Retorna
+    o quadro completo e o de despesas (com Valor_Absoluto).
+    """
+    df["Data"] = pd.to_datetime(df["Data"])
+
+    # Mês: códigos inteiros sobre os poucos períodos distintos, sem formatar linha a linha
+    meses = df["Data"].dt.year.to_numpy() * 12 + df["Data"].dt.month.to_numpy() - 1
+    codigos, unicos = pd.factorize(meses, sort=True)
+    df["Mês"] = pd.Categorical.from_codes(
+        codigos, categories=[f"{m // 12}-{m % 12 + 1:02d}" for m in unicos]
+    )
+    df["Tipo"] = pd.Categorical.from_codes(
+        np.where(df["Valor"].to_numpy() > 0, 1, 0).astype("int8"), categories=["Despesa", "Receita"]
+    )
+    df["Categoria"] = df["Categoria"].astype("category")
+
+    df_despesas = df[df["Valor"] < 0].copy()
+    df_despesas["Valor_Absoluto"] = df_despesas["Valor"].abs()
+    df_despesas["Categoria"] = df_despesas["Categoria"].cat.remove_unused_categories()
+    return df, df_despesas
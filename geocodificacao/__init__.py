@@ -0,0 +1 @@
+# Serviço de geocoding da página de artistas (page3.py)
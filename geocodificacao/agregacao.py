@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from geocodificacao.artistas import COLUNA_ARTISTA
+
+
+def tamanho_celula(zoom, celulas_por_tile=8):
+    """Lado da célula em graus para um nível de zoom do mapa (tile de 360/2^zoom graus)"""
+    return 360.0 / (2 ** zoom) / celulas_por_tile
+
+
+def agregar_grade(map_df, tamanho, coluna=COLUNA_ARTISTA, top=3):
+    """Agrupa os pontos em células de `tamanho` graus: centro de massa, faixas, artistas e mais tocados
+
+    O número de linhas é limitado pelo número de células ocupadas, não pelo de faixas.
+    """
+    if map_df.empty:
+        return pd.DataFrame(columns=["lat", "lon", "faixas", "artistas", "top_artistas"])
+
+    linha = np.floor((map_df["lat"].to_numpy() + 90.0) / tamanho).astype("int64")
+    coluna_celula = np.floor((map_df["lon"].to_numpy() + 180.0) / tamanho).astype("int64")
+    pontos = pd.DataFrame({
+        "celula": linha * (int(360.0 / tamanho) + 1) + coluna_celula,
+        "lat": map_df["lat"].to_numpy(),
+        "lon": map_df["lon"].to_numpy(),
+        "artista": map_df[coluna].to_numpy(),
+    })
+
+    celulas = pontos.groupby("celula", sort=False).agg(
+        lat=("lat", "mean"),
+        lon=("lon", "mean"),
+        faixas=("artista", "size"),
+        artistas=("artista", "nunique"),
+    )
+
+    # Artistas com mais faixas em cada célula
+    contagem = pontos.groupby(["celula", "artista"], sort=False).size().rename("n").reset_index()
+    contagem = contagem.sort_values(["celula", "n"], ascending=[True, False], kind="stable")
+    top_artistas = contagem.groupby("celula", sort=False).head(top).groupby("celula", sort=False)["artista"].agg(", ".join)
+
+    return celulas.join(top_artistas.rename("top_artistas")).reset_index(drop=True)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from geocodificacao.cache import normalizar_nome
+
+COLUNA_ARTISTA = "Artist name"
+
+
+def artistas_unicos(df, coluna=COLUNA_ARTISTA):
+    """(chaves por linha, DataFrame de artistas únicos com colunas chave/artista/faixas)"""
+    nomes = df[coluna].fillna("").astype(str)
+    # Normaliza só os valores distintos e espalha o resultado de volta com map
+    distintos = pd.unique(nomes)
+    chaves = nomes.map(dict(zip(distintos, (normalizar_nome(n) for n in distintos))))
+
+    unicos = (
+        pd.DataFrame({"chave": chaves, "artista": nomes})
+        .loc[lambda d: d["chave"] != ""]
+        .groupby("chave", sort=False)
+        .agg(artista=("artista", "first"), faixas=("artista", "size"))
+        .reset_index()
+    )
+    return chaves, unicos
+
+
+def juntar_coordenadas(df, chaves, coordenadas):
+    """Acrescenta lat/lon às faixas via merge com o DataFrame chave/lat/lon dos artistas"""
+    resultado = df.assign(chave=chaves.to_numpy()).merge(coordenadas[["chave", "lat", "lon"]], on="chave", how="left")
+    return resultado.drop(columns="chave")
+
+
+def quadro_coordenadas(unicos, lats, lons):
+    """DataFrame chave/artista/faixas/lat/lon a partir dos vetores preenchidos pelo geocoding"""
+    return unicos.assign(
+        lat=np.asarray(lats, dtype="float64"),
+        lon=np.asarray(lons, dtype="float64"),
+    )
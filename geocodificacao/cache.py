@@ -0,0 +1,70 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# Local padrão do cache em disco (fora do controle de versão)
+CAMINHO_CACHE_PADRAO = os.path.join(".cache", "geocoding.sqlite3")
+
+# Por quanto tempo um "não encontrado" é lembrado antes de consultar de novo
+TTL_NEGATIVO_PADRAO = 7 * 24 * 60 * 60
+
+
+def normalizar_nome(nome):
+    """Chave do cache: sem acentos, minúsculas e espaços simples"""
+    sem_acentos = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", sem_acentos).strip().casefold()
+
+
+class CacheCoordenadas:
+    """Cache persistente (SQLite) de coordenadas, incluindo resultados negativos com TTL"""
+
+    def __init__(self, caminho=CAMINHO_CACHE_PADRAO, ttl_negativo=TTL_NEGATIVO_PADRAO, relogio=time.time):
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.ttl_negativo = ttl_negativo
+        self.acertos = 0
+        self.falhas = 0
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS coordenadas (
+                nome TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                gravado_em REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def obter(self, nome):
+        """(encontrado, (lat, lon)); encontrado=False quando não há entrada válida no cache"""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT lat, lon, gravado_em FROM coordenadas WHERE nome = ?", (normalizar_nome(nome),)
+            ).fetchone()
+            if linha is None:
+                self.falhas += 1
+                return False, (None, None)
+            lat, lon, gravado_em = linha
+            # Negativos expiram para que o nome seja tentado de novo
+            if lat is None and self._relogio() - gravado_em > self.ttl_negativo:
+                self.falhas += 1
+                return False, (None, None)
+            self.acertos += 1
+            return True, (lat, lon)
+
+    def gravar(self, nome, lat, lon):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO coordenadas (nome, lat, lon, gravado_em) VALUES (?, ?, ?, ?)",
+                (normalizar_nome(nome), lat, lon, self._relogio()),
+            )
+            self._conn.commit()
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from geocodificacao.cache import normalizar_nome
+
+# Colunas do dump do GeoNames (allCountries.txt, cities500.txt, ...), separado por tab e sem cabeçalho
+COLUNAS_GEONAMES = {1: "nome", 2: "nome_ascii", 3: "alternativos", 4: "lat", 5: "lon", 14: "populacao"}
+
+
+def ler_geonames(caminho, alternativos=False):
+    """DataFrame nome/lat/lon/populacao a partir de um dump do GeoNames"""
+    df = pd.read_csv(
+        caminho,
+        sep="\t",
+        header=None,
+        usecols=list(COLUNAS_GEONAMES),
+        quoting=3,
+        dtype={1: str, 2: str, 3: str},
+        keep_default_na=False,
+    ).rename(columns=COLUNAS_GEONAMES)
+
+    partes = [df[["nome", "lat", "lon", "populacao"]], df[["nome_ascii", "lat", "lon", "populacao"]].rename(columns={"nome_ascii": "nome"})]
+    if alternativos:
+        extras = df[["alternativos", "lat", "lon", "populacao"]].assign(nome=df["alternativos"].str.split(","))
+        partes.append(extras.explode("nome")[["nome", "lat", "lon", "populacao"]])
+    return pd.concat(partes, ignore_index=True)
+
+
+def ler_tabela(caminho):
+    """DataFrame nome/lat/lon/populacao a partir de um CSV simples (nome, lat, lon[, populacao])"""
+    df = pd.read_csv(caminho)
+    if "populacao" not in df.columns:
+        df["populacao"] = 0
+    return df[["nome", "lat", "lon", "populacao"]]
+
+
+class Gazetteer:
+    """Índice local nome -> (lat, lon) em arrays ordenados, com busca binária"""
+
+    def __init__(self, lugares):
+        nomes = lugares["nome"].fillna("").astype(str)
+        distintos = pd.unique(nomes)
+        chaves = nomes.map(dict(zip(distintos, (normalizar_nome(n) for n in distintos))))
+
+        # Para nomes repetidos fica o lugar mais populoso
+        tabela = (
+            pd.DataFrame({"chave": chaves, "lat": lugares["lat"], "lon": lugares["lon"], "populacao": lugares["populacao"]})
+            .loc[lambda d: d["chave"] != ""]
+            .sort_values(["chave", "populacao"], ascending=[True, False], kind="stable")
+            .drop_duplicates("chave")
+        )
+        self.chaves = tabela["chave"].to_numpy(dtype=str)
+        self.coordenadas = tabela[["lat", "lon"]].to_numpy(dtype="float64")
+
+    @classmethod
+    def carregar(cls, caminho, alternativos=False):
+        if caminho.endswith((".txt", ".tsv")):
+            return cls(ler_geonames(caminho, alternativos=alternativos))
+        return cls(ler_tabela(caminho))
+
+    def __len__(self):
+        return len(self.chaves)
+
+    def buscar_varios(self, nomes):
+        """Arrays (lat, lon) para os nomes; NaN onde não há correspondência"""
+        consultas = np.array([normalizar_nome(n) for n in nomes], dtype=str)
+        if not len(self.chaves) or not len(consultas):
+            vazio = np.full(len(consultas), np.nan)
+            return vazio, vazio.copy()
+        posicoes = np.searchsorted(self.chaves, consultas)
+        posicoes = np.minimum(posicoes, len(self.chaves) - 1)
+        achou = self.chaves[posicoes] == consultas
+        lats = np.where(achou, self.coordenadas[posicoes, 0], np.nan)
+        lons = np.where(achou, self.coordenadas[posicoes, 1], np.nan)
+        return lats, lons
+
+    def buscar(self, nome):
+        """(lat, lon) do nome, ou (None, None) se não estiver no índice"""
+        chave = normalizar_nome(nome)
+        # Mais longo que o maior nome do índice: não existe, e evita converter o array inteiro
+        if len(chave) > self.chaves.dtype.itemsize // 4:
+            return None, None
+        posicao = np.searchsorted(self.chaves, chave)
+        if posicao < len(self.chaves) and self.chaves[posicao] == chave:
+            lat, lon = self.coordenadas[posicao]
+            return float(lat), float(lon)
+        return None, None
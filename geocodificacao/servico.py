@@ -0,0 +1,147 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from geocodificacao.cache import normalizar_nome
+
+
+class LimiteTaxa:
+    """Espaça as chamadas para no máximo `requisicoes_por_segundo`, entre todas as threads"""
+
+    def __init__(self, requisicoes_por_segundo, relogio=time.monotonic, dormir=time.sleep):
+        self.intervalo = 1.0 / requisicoes_por_segundo if requisicoes_por_segundo else 0.0
+        self._relogio = relogio
+        self._dormir = dormir
+        self._proximo = 0.0
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        if not self.intervalo:
+            return
+        with self._lock:
+            agora = self._relogio()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            self._dormir(espera)
+
+
+class BackendNominatim:
+    """Backend remoto (OpenStreetMap Nominatim) com um único cliente compartilhado"""
+
+    # A política de uso do Nominatim público é de no máximo 1 requisição por segundo
+    requisicoes_por_segundo = 1.0
+
+    def __init__(self, user_agent="streamlit_app", timeout=10):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._cliente = None
+        self._lock = threading.Lock()
+
+    def _obter_cliente(self):
+        # geopy só é importado na primeira consulta que não sai do gazetteer nem do cache
+        with self._lock:
+            if self._cliente is None:
+                from geopy.geocoders import Nominatim
+
+                self._cliente = Nominatim(user_agent=self.user_agent)
+            return self._cliente
+
+    def geocodificar(self, nome):
+        location = self._obter_cliente().geocode(nome, timeout=self.timeout)
+        if location:
+            return location.latitude, location.longitude
+        return None, None
+
+
+class BackendStub:
+    """Backend local para testes e benchmarks offline: consulta uma tabela fixa"""
+
+    requisicoes_por_segundo = None
+
+    def __init__(self, tabela=None, latencia=0.0):
+        self.tabela = {normalizar_nome(nome): coordenadas for nome, coordenadas in (tabela or {}).items()}
+        self.latencia = latencia
+        self.chamadas = 0
+
+    def geocodificar(self, nome):
+        self.chamadas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        return self.tabela.get(normalizar_nome(nome), (None, None))
+
+
+class ServicoGeocodificacao:
+    """Geocoding com gazetteer local opcional, cache persistente, pool de threads limitado e limite de taxa do provedor"""
+
+    def __init__(self, backend, cache=None, max_workers=4, requisicoes_por_segundo=None, gazetteer=None,
+                 ttl_erro=60.0, relogio=time.monotonic):
+        self.backend = backend
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.acertos_gazetteer = 0
+        self.max_workers = max_workers
+        if requisicoes_por_segundo is None:
+            requisicoes_por_segundo = backend.requisicoes_por_segundo
+        self.limite = LimiteTaxa(requisicoes_por_segundo)
+        # Erros de rede/limite de taxa ficam só em memória, por pouco tempo: nome normalizado -> expiração
+        self.ttl_erro = ttl_erro
+        self._relogio = relogio
+        self._erros = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="geocoding")
+
+    def geocodificar(self, nome):
+        """(lat, lon) do nome, ou (None, None) se não encontrado"""
+        if self.gazetteer is not None:
+            lat, lon = self.gazetteer.buscar(nome)
+            if lat is not None:
+                self.acertos_gazetteer += 1
+                return lat, lon
+        return self._geocodificar_remoto(nome)
+
+    def _geocodificar_remoto(self, nome):
+        if self.cache is not None:
+            encontrado, coordenadas = self.cache.obter(nome)
+            if encontrado:
+                return coordenadas
+
+        chave = normalizar_nome(nome)
+        expira = self._erros.get(chave)
+        if expira is not None:
+            if self._relogio() < expira:
+                return None, None
+            self._erros.pop(chave, None)
+
+        self.limite.aguardar()
+        try:
+            lat, lon = self.backend.geocodificar(nome)
+        except Exception:
+            # Erros de rede não viram negativo no cache persistente: o nome será tentado de novo
+            # depois de `ttl_erro`, sem esperar pelo limite de taxa e pelo timeout a cada rerun
+            if self.ttl_erro:
+                self._erros[chave] = self._relogio() + self.ttl_erro
+            return None, None
+
+        if self.cache is not None:
+            self.cache.gravar(nome, lat, lon)
+        return lat, lon
+
+    def geocodificar_varios(self, nomes):
+        """Gera (índice, (lat, lon)) na ordem em que os resultados ficam prontos"""
+        nomes = list(nomes)
+        pendentes = range(len(nomes))
+        if self.gazetteer is not None:
+            # Caminho rápido: o índice local resolve o lote inteiro de uma vez, sem threads
+            lats, lons = self.gazetteer.buscar_varios(nomes)
+            pendentes = []
+            for i, (lat, lon) in enumerate(zip(lats, lons)):
+                if not math.isnan(lat):
+                    self.acertos_gazetteer += 1
+                    yield i, (float(lat), float(lon))
+                else:
+                    pendentes.append(i)
+
+        futuros = {self._executor.submit(self._geocodificar_remoto, nomes[i]): i for i in pendentes}
+        for futuro in as_completed(futuros):
+            yield futuros[futuro], futuro.result()
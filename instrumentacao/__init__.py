@@ -0,0 +1 @@
+# Instrumentação leve (spans e contadores) compartilhada pelas páginas
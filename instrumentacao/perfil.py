@@ -0,0 +1,195 @@
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import Counter
+
+# Rastro do rerun atual (None = instrumentação desligada nesta sessão)
+_rastro_atual = contextvars.ContextVar("rastro_atual", default=None)
+
+# Destino dos spans numa thread de job: a fila da sessão que iniciou o job (None = não registra)
+_fundo_atual = contextvars.ContextVar("fundo_atual", default=None)
+_trava_fundo = threading.Lock()
+
+# Medidores do processo (acertos/falhas de caches, tokens...): nome -> função que devolve um dict
+_medidores = {}
+
+
+class Rastro:
+    """Spans e contadores de um rerun"""
+
+    __slots__ = ("nome", "inicio", "fim", "spans", "contadores", "fundo", "_profundidade")
+
+    def __init__(self, nome, fundo=None):
+        self.nome = nome
+        # Fila da sessão para os spans dos jobs que este rerun iniciar
+        self.fundo = fundo
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.spans = []
+        self.contadores = Counter()
+        self._profundidade = 0
+
+    @property
+    def duracao_ms(self):
+        fim = self.fim if self.fim is not None else time.perf_counter()
+        return (fim - self.inicio) * 1000
+
+    def como_dict(self):
+        return {
+            "nome": self.nome,
+            "duracao_ms": round(self.duracao_ms, 3),
+            "spans": [
+                {"nome": nome, "inicio_ms": round(inicio, 3), "duracao_ms": round(duracao, 3), "profundidade": profundidade}
+                for nome, inicio, duracao, profundidade in self.spans
+            ],
+            "contadores": dict(self.contadores),
+        }
+
+
+class _Span:
+    __slots__ = ("nome", "rastro", "inicio", "profundidade")
+
+    def __init__(self, nome, rastro):
+        self.nome = nome
+        self.rastro = rastro
+
+    def __enter__(self):
+        if self.rastro is not None:
+            self.profundidade = self.rastro._profundidade
+            self.rastro._profundidade += 1
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        fim = time.perf_counter()
+        duracao = (fim - self.inicio) * 1000
+        if self.rastro is not None:
+            self.rastro._profundidade -= 1
+            self.rastro.spans.append((self.nome, (self.inicio - self.rastro.inicio) * 1000, duracao, self.profundidade))
+        else:
+            with _trava_fundo:
+                _fundo_atual.get().append({"nome": self.nome, "thread": threading.current_thread().name, "quando": time.time(), "duracao_ms": round(duracao, 3)})
+        return False
+
+
+class _SpanNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _SpanNulo()
+
+
+def iniciar(nome, ativo, fundo=None):
+    """Abre o rastro do rerun (ou desliga a instrumentação na thread, se `ativo` for falso)
+
+    `fundo` é a fila da sessão que recebe os spans dos jobs iniciados neste rerun.
+    """
+    rastro = Rastro(nome, fundo) if ativo else None
+    _rastro_atual.set(rastro)
+    return rastro
+
+
+def finalizar():
+    rastro = _rastro_atual.get()
+    if rastro is not None:
+        rastro.fim = time.perf_counter()
+    return rastro
+
+
+def span(nome):
+    """Context manager que mede o bloco; sem instrumentação ligada devolve um span nulo"""
+    rastro = _rastro_atual.get()
+    if rastro is None and _fundo_atual.get() is None:
+        return _NULO
+    return _Span(nome, rastro)
+
+
+def medir(nome=None):
+    """Decorador equivalente a `with span(nome)` em volta da função"""
+
+    def decorador(funcao):
+        rotulo = nome or funcao.__qualname__
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if _rastro_atual.get() is None and _fundo_atual.get() is None:
+                return funcao(*args, **kwargs)
+            with _Span(rotulo, _rastro_atual.get()):
+                return funcao(*args, **kwargs)
+
+        return envolvida
+
+    return decorador
+
+
+def segundo_plano(funcao):
+    """Prepara `funcao` para rodar numa thread de job
+
+    Se o rerun que inicia o job estiver instrumentado, os spans da thread vão para a
+    fila de segundo plano da sessão; senão a função é devolvida sem alteração.
+    """
+    rastro = _rastro_atual.get()
+    if rastro is None or rastro.fundo is None:
+        return funcao
+    fundo = rastro.fundo
+
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        # Threads do pool são reaproveitadas: o destino vale só durante o job
+        token = _fundo_atual.set(fundo)
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            _fundo_atual.reset(token)
+
+    return envolvida
+
+
+def contar(nome, n=1):
+    """Soma `n` ao contador do rerun atual (sem efeito se a instrumentação estiver desligada)"""
+    rastro = _rastro_atual.get()
+    if rastro is not None:
+        rastro.contadores[nome] += n
+
+
+def registrar_medidor(nome, funcao):
+    """Registra uma função que devolve contadores do processo (ex.: acertos/falhas de um cache)"""
+    _medidores[nome] = funcao
+
+
+def medidores():
+    valores = {}
+    for nome, funcao in list(_medidores.items()):
+        try:
+            valores[nome] = funcao()
+        except Exception:
+            continue
+    return valores
+
+
+def spans_fundo(fundo):
+    """Cópia dos spans de segundo plano guardados na fila da sessão"""
+    with _trava_fundo:
+        return list(fundo)
+
+
+def exportar_json(rastros, fundo=()):
+    """JSON com os rastros dos reruns, os spans de segundo plano da sessão e os medidores do processo"""
+    return json.dumps(
+        {
+            "reruns": [rastro.como_dict() for rastro in rastros],
+            "segundo_plano": spans_fundo(fundo),
+            "medidores": medidores(),
+        },
+        ensure_ascii=False,
+        indent=2,
+        default=str,
+    )
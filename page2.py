@@ -1,16 +1,20 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
-import ofxparse
-import io
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers.string import StrOutputParser
 import os
-
-# Configuração da página
-st.set_page_config(layout="wide", page_title="Dashboard Finanças Pessoais")
+from financas.ofx import ler_ofx
+from financas.transacoes import preparar_transacoes
+from financas.cubo import CuboGastos
+from financas.armazenamento import ArmazemTransacoes, CAMINHO_ARMAZEM_PADRAO
+from financas.arquivos import EXTENSOES_HISTORICO, exportar_arrow, exportar_parquet, ler_historico
+from financas.tabela import IndiceTokens, TAMANHO_PAGINA_PADRAO, pagina_transacoes
+from financas.extratos import CacheExtratos, hash_conteudo
+from financas.cache import CacheCategorias, hash_prompt
+from financas.empacotamento import TEMPLATE_PACOTE
+from financas.categorizacao import TEMPLATE_ITEM, importar_transacoes
+from financas.jobs import RegistroJobs, CONCLUIDO, ERRO
+from financas.classificador import ClassificadorLocal, REGRAS_PADRAO, LIMIAR_CONFIANCA_PADRAO
+from instrumentacao import perfil
 
 # Título do Dashboard
 st.title("📊 Dashboard de Finanças Pessoais")
@@ -31,31 +35,147 @@ def get_openai_key():
         st.error(f"Erro ao carregar configurações: {e}")
         return None
 
+# Cache persistente de categorias, compartilhado entre sessões
+@st.cache_resource
+def get_cache_categorias():
+    max_entradas = 50000
+    try:
+        if hasattr(st, 'secrets') and 'config' in st.secrets and 'cache_max_entradas' in st.secrets.config:
+            max_entradas = int(st.secrets.config.cache_max_entradas)
+    except:
+        pass
+    cache = CacheCategorias(max_entradas=max_entradas)
+    perfil.registrar_medidor("cache_categorias", lambda: {"acertos": cache.acertos, "falhas": cache.falhas})
+    return cache
+
+# Extratos já processados, compartilhados entre reruns e sessões
+@st.cache_resource
+def get_cache_extratos():
+    max_entradas = 16
+    ttl = 6 * 60 * 60
+    try:
+        if hasattr(st, 'secrets') and 'config' in st.secrets:
+            max_entradas = int(st.secrets.config.get('extratos_max_entradas', max_entradas))
+            ttl = int(st.secrets.config.get('extratos_ttl', ttl))
+    except:
+        pass
+    return CacheExtratos(max_entradas=max_entradas, ttl=ttl)
+
+# Histórico persistente de transações: um único por instalação, compartilhado por todas as sessões
+# (o dashboard é de uso pessoal; para vários usuários, rode uma instância por pessoa)
+@st.cache_resource
+def get_armazem():
+    caminho = CAMINHO_ARMAZEM_PADRAO
+    try:
+        if hasattr(st, 'secrets') and 'config' in st.secrets:
+            caminho = st.secrets.config.get('armazem', caminho)
+    except:
+        pass
+    return ArmazemTransacoes(caminho)
+
+# Cubo de despesas de todo o histórico, agregado no SQLite e atualizado a cada importação
+@st.cache_resource
+def get_cubo():
+    return CuboGastos.de_agregado(get_armazem().agregado_despesas())
+
+# Transações de um mês, lidas do histórico sob demanda (a versão invalida o cache)
+@st.cache_data(max_entries=24, show_spinner=False)
+def carregar_mes(mes, versao):
+    df_mes, df_despesas_mes = preparar_transacoes(get_armazem().carregar_mes(mes))
+    return df_mes, df_despesas_mes, IndiceTokens(df_despesas_mes["Descrição"])
+
+# Figuras dos gráficos, reaproveitadas enquanto os dados agregados não mudam
+@st.cache_resource
+def get_fabrica_figuras():
+    # plotly só é importado quando há dados para desenhar
+    from financas.graficos import FabricaFiguras
+    fabrica = FabricaFiguras()
+    perfil.registrar_medidor("figuras", lambda: {"acertos": fabrica.acertos, "falhas": fabrica.falhas})
+    return fabrica
+
+# Cliente do modelo e chains, criados na primeira categorização e mantidos aquecidos entre sessões
+@st.cache_resource
+def get_chains(model_name, temperature, openai_api_key):
+    # Importados só aqui: langchain/openai são as dependências mais lentas de carregar
+    from langchain_openai import ChatOpenAI
+    from langchain_core.prompts import PromptTemplate
+    from langchain_core.output_parsers.string import StrOutputParser
+    from financas.tokens import ContadorTokens
+
+    # Tokens de todas as chamadas deste cliente, exibidos no painel de tempos
+    tokens = ContadorTokens()
+    perfil.registrar_medidor(f"tokens ({model_name})", tokens.totais)
+    chat = ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        openai_api_key=openai_api_key,
+        callbacks=[tokens]
+    )
+    chain = PromptTemplate.from_template(TEMPLATE_ITEM) | chat | StrOutputParser()
+    chain_pacote = PromptTemplate.from_template(TEMPLATE_PACOTE) | chat | StrOutputParser()
+    return chain, chain_pacote
+
+# Jobs de categorização em segundo plano, compartilhados entre reruns e sessões
+@st.cache_resource
+def get_registro_jobs():
+    return RegistroJobs()
+
+# Classificador local (regras + modelo treinado no histórico rotulado)
+@st.cache_resource
+def get_classificador_local():
+    regras = list(REGRAS_PADRAO)
+    historico = os.path.join("samples", "finances.csv")
+    limiar = LIMIAR_CONFIANCA_PADRAO
+    try:
+        if hasattr(st, 'secrets'):
+            # Regras extras no secrets.toml: [regras] "UBER|99APP" = "Transporte"
+            if 'regras' in st.secrets:
+                regras = [(padrao, categoria, None) for padrao, categoria in st.secrets.regras.items()] + regras
+            if 'config' in st.secrets:
+                historico = st.secrets.config.get('historico_rotulado', historico)
+                limiar = float(st.secrets.config.get('limiar_confianca', limiar))
+    except:
+        pass
+    
+    classificador = ClassificadorLocal(regras=regras, limiar=limiar)
+    if os.path.exists(historico):
+        # Só as colunas usadas no treino (Parquet/Arrow são lidos por memory-map)
+        df_historico = ler_historico(historico, colunas=["Descrição", "Categoria"]).dropna()
+        classificador.treinar(df_historico["Descrição"], df_historico["Categoria"])
+    return classificador
+
 # Função para processar arquivo OFX
-def processar_ofx(uploaded_file):
+@perfil.medir("processar_ofx")
+def processar_ofx(uploaded_file, ignorar_ids=None):
     try:
-        content = uploaded_file.getvalue().decode('ISO-8859-1')
-        ofx_file = io.StringIO(content)
-        ofx = ofxparse.OfxParser.parse(ofx_file)
-        
-        transactions_data = []
-        for account in ofx.accounts:
-            for transaction in account.statement.transactions:
-                transactions_data.append({
-                    "Data": transaction.date.date(),
-                    "Valor": float(transaction.amount),
-                    "Descrição": transaction.memo,
-                    "ID": transaction.id,
-                })
-        
-        df = pd.DataFrame(transactions_data)
+        # Leitura incremental dos blocos <STMTTRN>, com encoding detectado pelo cabeçalho
+        uploaded_file.seek(0)
+        df = ler_ofx(uploaded_file, ignorar_ids=ignorar_ids)
         return df
     except Exception as e:
         st.error(f"Erro ao processar arquivo OFX: {e}")
         return None
 
-# Função para categorizar transações (agora sem pedir API key)
-def categorizar_transacoes(df):
+# Função para importar histórico em CSV/Parquet/Arrow (mesmo esquema de samples/finances.csv)
+@perfil.medir("processar_historico")
+def processar_historico(uploaded_file, ignorar_ids=None):
+    try:
+        df = ler_historico(uploaded_file, uploaded_file.name)
+        if ignorar_ids:
+            df = df[~df["ID"].isin(ignorar_ids)]
+        return df.reset_index(drop=True)
+    except Exception as e:
+        st.error(f"Erro ao importar histórico: {e}")
+        return None
+
+# Histórico completo exportado, recalculado só quando o armazém muda
+@st.cache_data(max_entries=2, show_spinner=False)
+def exportar_historico(formato, versao):
+    df_historico = get_armazem().carregar()
+    return exportar_parquet(df_historico) if formato == "Parquet" else exportar_arrow(df_historico)
+
+# Configuração da categorização (lida aqui, na thread do script, antes de ir para segundo plano)
+def configurar_categorizacao():
     try:
         # Obter API key automaticamente
         openai_api_key = get_openai_key()
@@ -63,37 +183,15 @@ def categorizar_transacoes(df):
         if not openai_api_key:
             st.error("❌ API Key do OpenAI não configurada. Verifique o arquivo secrets.toml")
             return None
-
-        template = """
-        Você é um analista de dados, trabalhando em um projeto de limpeza de dados.
-        Seu trabalho é escolher uma categoria adequada para cada lançamento financeiro.
-
-        Escolha uma dentre as seguintes categorias:
-        - Alimentação
-        - Receitas
-        - Saúde
-        - Mercado
-        - Educação
-        - Compras
-        - Transporte
-        - Investimento
-        - Transferências para terceiros
-        - Telefone
-        - Moradia
-        - Lazer
-        - Serviços
-        - Outros
-
-        Item a categorizar: {text}
-
-        Responda apenas com o nome da categoria, sem explicações.
-        """
-
-        prompt = PromptTemplate.from_template(template=template)
         
         # Configurar o modelo com parâmetros do secrets (se disponíveis)
         model_name = "gpt-3.5-turbo"
         temperature = 0.3
+        # Itens por requisição no modo empacotado (1 desativa) e teto de tokens por pacote
+        tamanho_pacote = 20
+        max_tokens_pacote = 1500
+        concorrencia = 8
+        requisicoes_por_segundo = 5
         
         try:
             if hasattr(st, 'secrets') and 'config' in st.secrets:
@@ -101,47 +199,79 @@ def categorizar_transacoes(df):
                     model_name = st.secrets.config.model
                 if 'temperature' in st.secrets.config:
                     temperature = st.secrets.config.temperature
+                if 'tamanho_pacote' in st.secrets.config:
+                    tamanho_pacote = int(st.secrets.config.tamanho_pacote)
+                if 'max_tokens_pacote' in st.secrets.config:
+                    max_tokens_pacote = int(st.secrets.config.max_tokens_pacote)
+                concorrencia = int(st.secrets.config.get('concorrencia', concorrencia))
+                requisicoes_por_segundo = float(st.secrets.config.get('requisicoes_por_segundo', requisicoes_por_segundo))
         except:
             pass  # Usa valores padrão se não encontrar config
         
-        chat = ChatOpenAI(
-            model=model_name,
-            temperature=temperature,
-            openai_api_key=openai_api_key
-        )
-        
-        chain = prompt | chat | StrOutputParser()
-        
-        # Categorizar transações
-        st.info("Categorizando transações com IA...")
-        progress_bar = st.progress(0)
-        
-        categorias = []
-        batch_size = 20
-        
-        for i in range(0, len(df), batch_size):
-            batch = list(df["Descrição"].values[i:i+batch_size])
-            batch_categorias = chain.batch(batch)
-            categorias.extend(batch_categorias)
-            progress_bar.progress(min((i + batch_size) / len(df), 1.0))
+        chain, chain_pacote = get_chains(model_name, temperature, openai_api_key)
         
-        df["Categoria"] = categorias
-        progress_bar.empty()
-        st.success("Categorização concluída!")
-        return df
+        return dict(
+            chain=chain,
+            chain_pacote=chain_pacote,
+            classificador=get_classificador_local(),
+            cache=get_cache_categorias(),
+            modelo=model_name,
+            temperatura=temperature,
+            prompt_hash=hash_prompt(TEMPLATE_ITEM if tamanho_pacote <= 1 else TEMPLATE_PACOTE),
+            tamanho_pacote=tamanho_pacote,
+            max_tokens_pacote=max_tokens_pacote,
+            concorrencia=concorrencia,
+            requisicoes_por_segundo=requisicoes_por_segundo
+        )
         
     except Exception as e:
         st.error(f"Erro na categorização: {e}")
         return None
 
+# Progresso da categorização em segundo plano; o resto da página renderiza com o que já está pronto
+@st.fragment(run_every=2)
+def acompanhar_categorizacao(id_job):
+    job = get_registro_jobs().obter(id_job)
+    if job is not None and job.ativo:
+        st.progress(
+            job.progresso,
+            text=f"Categorizando com IA em segundo plano: {job.concluidos}/{job.total} transações prontas"
+        )
+        # Novas transações gravadas: atualiza o dashboard inteiro
+        if job.concluidos != st.session_state.get('job_concluidos'):
+            st.session_state.job_concluidos = job.concluidos
+            st.rerun(scope="app")
+    else:
+        # Terminou: um último rerun completo para o dashboard pegar as linhas finais
+        st.rerun(scope="app")
+
+# Resultado de um job de categorização já terminado
+def resumo_categorizacao(job):
+    if job.status == CONCLUIDO:
+        estatisticas = job.resultado
+        total = max(estatisticas["estabelecimentos"], 1)
+        st.caption(
+            f"{estatisticas['transacoes']} transações, {estatisticas['estabelecimentos']} estabelecimentos únicos — "
+            f"regras: {estatisticas['regra'] / total:.0%}, modelo local: {estatisticas['modelo'] / total:.0%}, "
+            f"cache: {estatisticas['cache'] / total:.0%}, LLM: {estatisticas['llm'] / total:.0%}"
+        )
+        st.success(f"✅ Categorização concluída! {estatisticas['inseridas']} novas transações adicionadas ao histórico.")
+    elif job.status == ERRO:
+        st.error(f"Erro na categorização: {job.erro}")
+        if st.button("Tentar novamente"):
+            del st.session_state['hash_arquivo']
+            st.rerun()
+
 # Sidebar simplificada (sem input de API key)
 st.sidebar.header("📁 Configurações")
 
 # Upload do arquivo OFX
 uploaded_file = st.sidebar.file_uploader(
-    "Faça upload do seu extrato OFX", 
-    type=['ofx', 'qfx'],
-    help="Selecione seu arquivo de extrato bancário no formato OFX"
+    "Faça upload do seu extrato OFX ou histórico", 
+    type=['ofx', 'qfx'] + [extensao.lstrip('.') for extensao in EXTENSOES_HISTORICO],
+    help="Extrato bancário em OFX, ou histórico em CSV/Parquet/Arrow com as colunas ID, Data, Valor, Descrição, Categoria",
+    # Nova chave a cada limpeza: o arquivo enviado sai do uploader e não é reimportado
+    key=f"upload_{st.session_state.get('limpezas', 0)}"
 )
 
 # Verificar se a API Key está configurada
@@ -162,40 +292,88 @@ else:
     st.sidebar.success("✅ API Key configurada")
 
 # Processar dados apenas se temos arquivo
-if uploaded_file is not None and openai_api_key:
-    with st.spinner("Processando arquivo OFX..."):
-        df = processar_ofx(uploaded_file)
+if uploaded_file is not None:
+    hash_arquivo = hash_conteudo(uploaded_file.getvalue())
+    registro_jobs = get_registro_jobs()
     
-    if df is not None:
-        df = categorizar_transacoes(df)
+    # Mudanças de filtro não reprocessam: o extrato já foi importado nesta sessão
+    if st.session_state.get('hash_arquivo') != hash_arquivo:
+        cache_extratos = get_cache_extratos()
+        job = registro_jobs.obter(hash_arquivo)
         
-        if df is not None:
-            # Preparar dados para dashboard
-            df["Mês"] = df["Data"].apply(lambda x: f"{x.year}-{x.month:02d}")
-            df["Tipo"] = df["Valor"].apply(lambda x: "Receita" if x > 0 else "Despesa")
-            
-            df_despesas = df[df["Valor"] < 0].copy()
-            df_despesas["Valor_Absoluto"] = df_despesas["Valor"].abs()
+        if cache_extratos.obter(hash_arquivo) is not None or (job is not None and job.status == CONCLUIDO):
+            st.info("Este arquivo já foi importado para o histórico.")
+            st.session_state.hash_arquivo = hash_arquivo
+        elif job is not None and job.ativo:
+            # Outra sessão já está categorizando este arquivo: reanexa ao job
+            st.session_state.hash_arquivo = hash_arquivo
+        else:
+            armazem = get_armazem()
+            cubo = get_cubo()
             
-            st.session_state.df_processed = df
-            st.session_state.df_despesas = df_despesas
+            # Transações já presentes no histórico (mesmo ID) nem chegam a ser convertidas
+            if uploaded_file.name.lower().endswith(EXTENSOES_HISTORICO):
+                with st.spinner("Importando histórico..."):
+                    df = processar_historico(uploaded_file, ignorar_ids=armazem.ids())
+            else:
+                with st.spinner("Processando arquivo OFX..."):
+                    df = processar_ofx(uploaded_file, ignorar_ids=armazem.ids())
             
-            st.success(f"✅ {len(df)} transações processadas com sucesso!")
+            if df is not None:
+                # Linhas que já vêm rotuladas vão direto para o histórico, sem LLM
+                sem_categoria = df["Categoria"].isna() if "Categoria" in df.columns else pd.Series(True, index=df.index)
+                rotuladas = armazem.inserir(df[~sem_categoria])
+                if not rotuladas.empty:
+                    _, rotuladas_despesas = preparar_transacoes(rotuladas.copy())
+                    cubo.acrescentar(rotuladas_despesas)
+                
+                if sem_categoria.any():
+                    config = configurar_categorizacao()
+                    if config is not None:
+                        # O restante é categorizado em segundo plano, gravando resultados parciais
+                        registro_jobs.iniciar(
+                            hash_arquivo,
+                            perfil.segundo_plano(importar_transacoes),
+                            df[sem_categoria].drop(columns="Categoria", errors="ignore").reset_index(drop=True),
+                            armazem,
+                            cubo,
+                            **config
+                        )
+                        st.session_state.hash_arquivo = hash_arquivo
+                else:
+                    cache_extratos.gravar(hash_arquivo, len(rotuladas))
+                    st.session_state.hash_arquivo = hash_arquivo
+                    st.success(f"✅ {len(rotuladas)} novas transações adicionadas ao histórico!")
 
-# Verificar se temos dados processados
-if 'df_processed' in st.session_state and 'df_despesas' in st.session_state:
-    df = st.session_state.df_processed
-    df_despesas = st.session_state.df_despesas
+# Acompanhar a categorização do arquivo desta sessão, reanexando ao job após reruns
+if st.session_state.get('hash_arquivo'):
+    job = get_registro_jobs().obter(st.session_state.hash_arquivo)
+    if job is not None and job.ativo:
+        # Num rerun completo o dashboard já está atualizado: o fragmento só reroda a página
+        # quando o progresso mudar depois daqui (senão cliques nesta execução se perderiam)
+        st.session_state.job_concluidos = job.concluidos
+        acompanhar_categorizacao(job.id)
+    elif job is not None:
+        resumo_categorizacao(job)
+
+# Verificar se temos dados no histórico
+armazem = get_armazem()
+meses_disponiveis = armazem.meses()
+if meses_disponiveis:
+    cubo = get_cubo()
+    fabrica_figuras = get_fabrica_figuras()
     
     # Filtros
     st.sidebar.header("🎛️ Filtros")
     
     # Filtro de mês
-    meses_disponiveis = sorted(df["Mês"].unique(), reverse=True)
     mes_selecionado = st.sidebar.selectbox("Mês", meses_disponiveis)
     
+    # Apenas o mês selecionado é carregado do histórico
+    df, df_despesas, indice_busca = carregar_mes(mes_selecionado, armazem.versao)
+    
     # Filtro de categoria
-    categorias_disponiveis = df_despesas["Categoria"].unique().tolist()
+    categorias_disponiveis = cubo.categorias
     categorias_selecionadas = st.sidebar.multiselect(
         "Filtrar por Categorias", 
         categorias_disponiveis, 
@@ -203,6 +381,7 @@ if 'df_processed' in st.session_state and 'df_despesas' in st.session_state:
     )
     
     # Aplicar filtros
+    @perfil.medir("filter_data")
     def filter_data(df, mes, selected_categories):
         df_filtered = df[df['Mês'] == mes]
         if selected_categories:
@@ -211,17 +390,20 @@ if 'df_processed' in st.session_state and 'df_despesas' in st.session_state:
     
     df_filtered = filter_data(df_despesas, mes_selecionado, categorias_selecionadas)
     
+    # Métricas e gráficos leem fatias do cubo pré-agregado, não as linhas brutas
+    metricas = cubo.metricas(mes_selecionado, categorias_selecionadas)
+    
     # ============ NOVO LAYOUT ============
     
     # Seção 1: Estatísticas Principais
     st.subheader("📈 Estatísticas do Mês")
     
-    if not df_filtered.empty:
-        total_gasto = df_filtered["Valor_Absoluto"].sum()
-        num_transacoes = len(df_filtered)
-        avg_gasto = total_gasto / num_transacoes if num_transacoes > 0 else 0
-        categoria_maior_gasto = df_filtered.groupby("Categoria")["Valor_Absoluto"].sum().idxmax()
-        maior_gasto_valor = df_filtered.groupby("Categoria")["Valor_Absoluto"].sum().max()
+    if metricas is not None:
+        total_gasto = metricas["total"]
+        num_transacoes = metricas["quantidade"]
+        avg_gasto = metricas["media"]
+        categoria_maior_gasto = metricas["maior_categoria"]
+        maior_gasto_valor = metricas["maior_valor"]
         
         # Métricas em colunas
         stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
@@ -260,103 +442,34 @@ if 'df_processed' in st.session_state and 'df_despesas' in st.session_state:
     # Seção 2: Gráficos de Distribuição por Categoria
     st.subheader("📊 Distribuição por Categoria")
     
-    if not df_filtered.empty:
-        category_distribution = df_filtered.groupby("Categoria")["Valor_Absoluto"].sum().reset_index()
+    if metricas is not None:
+        category_distribution = cubo.por_categoria(mes_selecionado, categorias_selecionadas)
         
         # Três colunas para os gráficos
         chart_col1, chart_col2, chart_col3 = st.columns(3)
         
         with chart_col1:
             # Gráfico de Pizza
-            fig_pie = px.pie(
-                category_distribution, 
-                values='Valor_Absoluto', 
-                names='Categoria', 
-                title='<b>Distribuição em Pizza</b>',
-                hole=0.3,
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_pie.update_traces(
-                textposition='inside', 
-                textinfo='percent+label',
-                hovertemplate='<b>%{label}</b><br>R$ %{value:,.2f}<br>%{percent}'
-            )
-            fig_pie.update_layout(
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
+            st.plotly_chart(fabrica_figuras.figura("pizza", category_distribution), use_container_width=True)
         
         with chart_col2:
             # Gráfico de Barras Horizontal
-            fig_bar_h = px.bar(
-                category_distribution.sort_values('Valor_Absoluto', ascending=True),
-                y='Categoria',
-                x='Valor_Absoluto',
-                title='<b>Distribuição em Barras</b>',
-                color='Valor_Absoluto',
-                color_continuous_scale='Blues',
-                orientation='h'
-            )
-            fig_bar_h.update_layout(
-                height=400,
-                xaxis_title="Valor (R$)",
-                yaxis_title="",
-                showlegend=False
-            )
-            fig_bar_h.update_traces(
-                hovertemplate='<b>%{y}</b><br>R$ %{x:,.2f}'
-            )
-            st.plotly_chart(fig_bar_h, use_container_width=True)
+            st.plotly_chart(fabrica_figuras.figura("barras", category_distribution), use_container_width=True)
         
         with chart_col3:
-            # Gráfico de Rosca (Donut)
-            fig_donut = px.pie(
-                category_distribution, 
-                values='Valor_Absoluto', 
-                names='Categoria', 
-                title='<b>Visão em Rosca</b>',
-                hole=0.6,
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig_donut.update_traces(
-                textposition='outside', 
-                textinfo='percent+label',
-                hovertemplate='<b>%{label}</b><br>R$ %{value:,.2f}<br>%{percent}'
-            )
-            fig_donut.update_layout(
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig_donut, use_container_width=True)
+            # Gráfico de Rosca (Donut), derivado da pizza
+            st.plotly_chart(fabrica_figuras.figura("rosca", category_distribution), use_container_width=True)
     
     # Seção 3: Evolução Temporal
     st.subheader("📅 Evolução Temporal dos Gastos")
     
-    if not df_filtered.empty:
+    if metricas is not None:
         timeline_col1, timeline_col2 = st.columns([0.7, 0.3])
         
         with timeline_col1:
             # Gráfico de Linha
-            timeline_data = df_filtered.groupby("Data")["Valor_Absoluto"].sum().reset_index()
-            fig_timeline = px.line(
-                timeline_data, 
-                x='Data', 
-                y='Valor_Absoluto',
-                title='<b>Gastos ao Longo do Tempo</b>',
-                markers=True,
-                line_shape='spline'
-            )
-            fig_timeline.update_layout(
-                xaxis_title="Data",
-                yaxis_title="Valor (R$)",
-                hovermode='x unified'
-            )
-            fig_timeline.update_traces(
-                hovertemplate='<b>%{x}</b><br>R$ %{y:,.2f}',
-                line=dict(width=3)
-            )
-            st.plotly_chart(fig_timeline, use_container_width=True)
+            timeline_data = cubo.por_dia(mes_selecionado, categorias_selecionadas)
+            st.plotly_chart(fabrica_figuras.figura("linha", timeline_data), use_container_width=True)
         
         with timeline_col2:
             # Top 5 Transações
@@ -373,17 +486,43 @@ if 'df_processed' in st.session_state and 'df_despesas' in st.session_state:
     if not df_filtered.empty:
         # Mostrar tabela com opção de expandir/contrair
         with st.expander("Visualizar Todas as Transações", expanded=False):
+            busca_col, ordem_col, direcao_col = st.columns([0.5, 0.25, 0.25])
+            with busca_col:
+                busca = st.text_input("Buscar na descrição", placeholder="ex.: zaffari")
+            with ordem_col:
+                ordenar_por = st.selectbox("Ordenar por", ["Data", "Valor"])
+            with direcao_col:
+                ascendente = st.selectbox("Ordem", ["Decrescente", "Crescente"]) == "Crescente"
+            
+            # Busca no índice de tokens; ordenação e paginação no servidor
+            pagina_df, total_linhas, total_paginas, pagina_atual = pagina_transacoes(
+                df_filtered,
+                pagina=st.session_state.get("pagina_transacoes", 1),
+                tamanho=TAMANHO_PAGINA_PADRAO,
+                ordenar_por="Valor_Absoluto" if ordenar_por == "Valor" else "Data",
+                ascendente=ascendente,
+                rotulos=indice_busca.buscar(busca)
+            )
+            st.session_state.pagina_transacoes = pagina_atual
+            
             st.dataframe(
-                df_filtered[["Data", "Descrição", "Categoria", "Valor_Absoluto"]]
-                .rename(columns={"Valor_Absoluto": "Valor"})
-                .sort_values("Data", ascending=False)
-                .style.format({
-                    'Valor': 'R$ {:.2f}',
-                    'Data': lambda x: x.strftime('%d/%m/%Y')
-                }),
+                pagina_df[["Data", "Descrição", "Categoria", "Valor_Absoluto"]]
+                .rename(columns={"Valor_Absoluto": "Valor"}),
+                column_config={
+                    "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+                    "Valor": st.column_config.NumberColumn("Valor", format="R$ %.2f"),
+                },
+                hide_index=True,
                 use_container_width=True,
                 height=400
             )
+            st.number_input(
+                f"Página (de {total_paginas}, {total_linhas} transações)",
+                min_value=1,
+                max_value=total_paginas,
+                step=1,
+                key="pagina_transacoes"
+            )
     else:
         st.warning("Nenhuma transação encontrada para os filtros selecionados.")
 
@@ -404,14 +543,37 @@ else:
     - **Outros bancos**: Procure por "Exportar OFX" ou "Quicken format"
     
     ### 🔒 Segurança:
-    - Seus dados **nunca são salvos**
-    - Processamento ocorre **localmente** na sua sessão
+    - Seus dados ficam salvos **apenas localmente** (pasta `.cache/`)
+    - O histórico é **único por instalação**: todas as abas e pessoas que acessam este servidor veem os mesmos dados
+    - Para uso pessoal, rode o dashboard na sua máquina; não publique em um servidor compartilhado
+    - Use **Limpar Dados** para apagar o histórico
     - Arquivos **não são enviados** para o GitHub
     """)
 
-# Limpar dados da sessão
+# Exportar o histórico categorizado
+if meses_disponiveis:
+    st.sidebar.header("💾 Exportar")
+    formato_exportacao = st.sidebar.radio("Formato", ["Parquet", "Arrow"], horizontal=True)
+    if st.sidebar.button("Preparar arquivo"):
+        st.session_state.exportacao = formato_exportacao
+    if st.session_state.get('exportacao') == formato_exportacao:
+        st.sidebar.download_button(
+            f"⬇️ Baixar histórico ({formato_exportacao})",
+            data=exportar_historico(formato_exportacao, armazem.versao),
+            file_name="historico.parquet" if formato_exportacao == "Parquet" else "historico.arrow",
+            mime="application/octet-stream"
+        )
+
+# Limpar histórico e dados da sessão
 if st.sidebar.button("🔄 Limpar Dados"):
-    for key in ['df_processed', 'df_despesas']:
+    # Jobs em andamento são cancelados e o armazém recusa gravações de antes da limpeza
+    get_registro_jobs().limpar()
+    get_armazem().limpar()
+    get_cubo.clear()
+    get_cache_extratos().limpar()
+    carregar_mes.clear()
+    st.session_state.limpezas = st.session_state.get('limpezas', 0) + 1
+    for key in ['hash_arquivo', 'pagina_transacoes', 'exportacao', 'job_concluidos']:
         if key in st.session_state:
             del st.session_state[key]
     st.rerun()
@@ -1,44 +1,155 @@
 import streamlit as st
-from geopy.geocoders import Nominatim
-import time
-import numpy as np
+import io
+import os
 import pandas as pd
+from geocodificacao.cache import CacheCoordenadas, CAMINHO_CACHE_PADRAO, TTL_NEGATIVO_PADRAO
+from geocodificacao.servico import ServicoGeocodificacao, BackendNominatim, BackendStub
+from geocodificacao.gazetteer import Gazetteer
+from geocodificacao.artistas import COLUNA_ARTISTA, artistas_unicos, juntar_coordenadas, quadro_coordenadas
+from geocodificacao.agregacao import agregar_grade, tamanho_celula
+from instrumentacao import perfil
 
 st.title("Geocoding de Artistas Musicais") 
 
-# Carregar dados
-df = pd.read_csv('.\spotify.csv')
+# Playlist padrão, ao lado desta página
+CAMINHO_PLAYLIST_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spotify.csv")
 
-# Função para geocoding (pode ser lento para muitos dados)
+# Carregar dados (qualquer exportação de playlist com a coluna "Artist name")
 @st.cache_data
-def get_coordinates(artist_name):
-    geolocator = Nominatim(user_agent="streamlit_app")
+def carregar_playlist(conteudo=None):
+    if conteudo is None:
+        return pd.read_csv(CAMINHO_PLAYLIST_PADRAO)
+    return pd.read_csv(io.BytesIO(conteudo))
+
+uploaded_file = st.file_uploader("Exportação de playlist (CSV)", type=["csv"])
+df = carregar_playlist(uploaded_file.getvalue() if uploaded_file is not None else None)
+if COLUNA_ARTISTA not in df.columns:
+    st.error(f"O arquivo enviado não tem a coluna \"{COLUNA_ARTISTA}\". Envie uma exportação de playlist com essa coluna.")
+    st.stop()
+
+# Gazetteer local opcional (dump do GeoNames ou CSV nome/lat/lon), carregado uma vez por processo
+@st.cache_resource
+def get_gazetteer():
+    caminho = None
+    alternativos = False
+    try:
+        if hasattr(st, 'secrets') and 'config' in st.secrets:
+            caminho = st.secrets.config.get('gazetteer', caminho)
+            alternativos = bool(st.secrets.config.get('gazetteer_alternativos', alternativos))
+    except:
+        pass
+    if not caminho or not os.path.exists(caminho):
+        return None
+    return Gazetteer.carregar(caminho, alternativos=alternativos)
+
+# Serviço de geocoding compartilhado entre sessões: gazetteer local como caminho rápido,
+# um único cliente remoto, pool de threads limitado pela taxa do provedor e cache persistente em disco
+@st.cache_resource
+def get_servico_geocodificacao():
+    backend = "nominatim"
+    caminho = CAMINHO_CACHE_PADRAO
+    ttl_negativo = TTL_NEGATIVO_PADRAO
+    max_workers = 4
     try:
-        location = geolocator.geocode(artist_name, timeout=10)
-        if location:
-            return location.latitude, location.longitude
+        if hasattr(st, 'secrets') and 'config' in st.secrets:
+            backend = st.secrets.config.get('geocoding_backend', backend)
+            caminho = st.secrets.config.get('geocoding_cache', caminho)
+            ttl_negativo = int(st.secrets.config.get('geocoding_ttl_negativo', ttl_negativo))
+            max_workers = int(st.secrets.config.get('geocoding_workers', max_workers))
     except:
         pass
-    return None, None
+    # "stub" permite rodar a página offline (testes e benchmarks)
+    geocoder = BackendStub() if backend == "stub" else BackendNominatim(user_agent="streamlit_app")
+    cache = CacheCoordenadas(caminho, ttl_negativo=ttl_negativo)
+    servico = ServicoGeocodificacao(geocoder, cache, max_workers=max_workers, gazetteer=get_gazetteer())
+    perfil.registrar_medidor("geocoding", lambda: {
+        "gazetteer": servico.acertos_gazetteer,
+        "cache_acertos": cache.acertos,
+        "cache_falhas": cache.falhas,
+    })
+    return servico
 
-# Aplicar apenas a uma amostra (geocoding é lento)
-sample_df = df.head(44).copy()  # Apenas primeiras 20 linhas
+# Geocoding apenas dos artistas únicos: o custo cresce com artistas, não com faixas
+chaves, unicos = artistas_unicos(df)
 
 st.subheader("Geocoding de Artistas (pode demorar)")
+st.caption(f"{len(df)} faixas, {len(unicos)} artistas únicos")
 latest_iteration = st.empty()
 progress_bar = st.progress(0) 
+mapa = st.empty()
+
+# Modo progressivo: o mapa é redesenhado a cada lote de artistas resolvidos
+progressivo = st.toggle("Atualizar o mapa durante o geocoding", value=True)
+tamanho_lote = 25
+
+# Acima deste número de faixas os pontos são agregados no servidor por padrão
+LIMITE_PONTOS = 2000
+col1, col2 = st.columns(2)
+with col1:
+    modo_mapa = st.radio("Modo do mapa", ["Agregado", "Pontos"], index=0 if len(df) > LIMITE_PONTOS else 1, horizontal=True)
+with col2:
+    zoom = st.slider("Nível de detalhe (zoom)", min_value=0, max_value=8, value=2, disabled=modo_mapa != "Agregado")
+
+def desenhar_agregado(map_df):
+    import pydeck as pdk
+    # Uma bolha por célula da grade: o tamanho do payload depende das células, não das faixas
+    celulas = agregar_grade(map_df, tamanho_celula(zoom))
+    # A célula com mais faixas ocupa meia célula de raio (~111 km por grau)
+    maior = int(celulas['faixas'].max()) if len(celulas) else 1
+    camada = pdk.Layer(
+        "ScatterplotLayer",
+        data=celulas,
+        get_position="[lon, lat]",
+        get_radius="faixas",
+        radius_scale=tamanho_celula(zoom) * 111_000 / 2 / maior,
+        radius_min_pixels=4,
+        get_fill_color=[200, 30, 0, 160],
+        pickable=True,
+    )
+    mapa.pydeck_chart(pdk.Deck(
+        layers=[camada],
+        initial_view_state=pdk.ViewState(latitude=0, longitude=0, zoom=zoom),
+        tooltip={"text": "{faixas} faixas, {artistas} artistas\n{top_artistas}"},
+        map_style=None,
+    ))
+
+@perfil.medir("desenhar_mapa")
+def desenhar_mapa(coordenadas):
+    map_df = juntar_coordenadas(df, chaves, coordenadas)
+    # Filtrar apenas linhas com coordenadas válidas
+    map_df = map_df.dropna(subset=['lat', 'lon'])
+    if modo_mapa == "Agregado":
+        desenhar_agregado(map_df)
+    else:
+        mapa.map(map_df[['lat', 'lon']])
 
-lats, lons = [], []
-for i, artist in enumerate(sample_df['Artist name']):
-    lat, lon = get_coordinates(artist)
-    lats.append(lat if lat else np.random.uniform(-90, 90))
-    lons.append(lon if lon else np.random.uniform(-180, 180))
-    latest_iteration.text(f'Iteration {i+1}') 
-    progress_bar.progress((i + 1) / len(sample_df)) 
+# Coordenadas da playlist atual guardadas na sessão: mudar zoom ou modo do mapa não refaz o geocoding
+chave_playlist = hash(tuple(unicos['artista']))
+memorizado = st.session_state.get('coordenadas_playlist')
+if memorizado is not None and memorizado[0] == chave_playlist:
+    _, lats, lons = memorizado
+    latest_iteration.text(f'Iteration {len(unicos)}')
+    progress_bar.progress(1.0)
+else:
+    # Consultas em paralelo; os resultados chegam fora de ordem e são posicionados pelo índice
+    servico = get_servico_geocodificacao()
+    lats, lons = [None] * len(unicos), [None] * len(unicos)
+    with perfil.span("get_coordinates"):
+        for concluidos, (i, (lat, lon)) in enumerate(servico.geocodificar_varios(unicos['artista']), start=1):
+            lats[i], lons[i] = lat, lon
+            latest_iteration.text(f'Iteration {concluidos}') 
+            progress_bar.progress(concluidos / len(unicos)) 
+            if progressivo and concluidos % tamanho_lote == 0:
+                desenhar_mapa(quadro_coordenadas(unicos, lats, lons))
+    st.session_state.coordenadas_playlist = (chave_playlist, lats, lons)
+perfil.contar("artistas", len(unicos))
 
-sample_df['lat'] = lats
-sample_df['lon'] = lons 
+coordenadas = quadro_coordenadas(unicos, lats, lons)
+desenhar_mapa(coordenadas)
 
-# Filtrar apenas linhas com coordenadas válidas
-map_df = sample_df.dropna(subset=['lat', 'lon'])
-st.map(map_df[['lat', 'lon']])
\ No newline at end of file
+# Artistas sem coordenadas ficam fora do mapa e são listados, em vez de receberem posições aleatórias
+nao_resolvidos = coordenadas[coordenadas['lat'].isna()]
+if len(nao_resolvidos):
+    st.warning(f"{len(nao_resolvidos)} de {len(unicos)} artistas não foram localizados")
+    with st.expander("Artistas não localizados"):
+        st.dataframe(nao_resolvidos[['artista', 'faixas']], hide_index=True)
\ No newline at end of file
@@ -1,119 +1,38 @@
-import datetime
-import textwrap
 import streamlit as st
+import os
+from sistema_bancario.modelos import Banco
+from sistema_bancario.limites import JANELA_PADRAO
+from instrumentacao import perfil
 
 st.title("🏦 Sistema Bancário")
 
-class Usuario:
-    def __init__(self, nome, data_nascimento, cpf, endereco):
-        self.nome = nome
-        self.data_nascimento = data_nascimento
-        self.cpf = cpf
-        self.endereco = endereco
+# Banco único do processo, compartilhado por todas as sessões e recuperado do disco ao reiniciar
+@st.cache_resource
+def get_banco():
+    caminho_diario = os.path.join(".cache", "banco.wal")
+    caminho_snapshot = os.path.join(".cache", "banco.snapshot")
+    snapshot_a_cada = 10000
+    limite_valor_diario = None
+    janela = JANELA_PADRAO
+    try:
+        if hasattr(st, 'secrets') and 'config' in st.secrets:
+            caminho_diario = st.secrets.config.get('banco_diario', caminho_diario)
+            caminho_snapshot = st.secrets.config.get('banco_snapshot', caminho_snapshot)
+            snapshot_a_cada = int(st.secrets.config.get('banco_snapshot_a_cada', snapshot_a_cada))
+            limite_valor_diario = st.secrets.config.get('banco_limite_valor_diario', limite_valor_diario)
+            janela = int(st.secrets.config.get('banco_janela_saques', janela))
+    except:
+        pass
+    banco = Banco.abrir("0001", caminho_diario, caminho_snapshot, snapshot_a_cada=snapshot_a_cada,
+                        limite_valor_diario=limite_valor_diario, janela=janela)
+    perfil.registrar_medidor("banco", lambda: {"contas": len(banco.contas), "lotes_gravados": banco.diario.lotes})
+    return banco
 
-class Conta:
-    def __init__(self, agencia, numero_conta, usuario, limite_saques=3, limite_valor_saque=500.0):
-        self.agencia = agencia
-        self.numero_conta = numero_conta
-        self.usuario = usuario
-        self.saldo = 0.0
-        self.extrato = []
-        self.numero_saques = 0
-        self.limite_saques = limite_saques
-        self.limite_valor_saque = limite_valor_saque
-    
-    def depositar(self, valor):
-        if valor > 0:
-            self.saldo += valor
-            self.extrato.append(f"[{self._data_atual()}] Depósito:\tR$ {valor:.2f}")
-            return True, "Depósito realizado com sucesso!"
-        return False, "Operação falhou! O valor informado é inválido."
-    
-    def sacar(self, valor):
-        excedeu_saldo = valor > self.saldo
-        excedeu_limite = valor > self.limite_valor_saque
-        excedeu_saques = self.numero_saques >= self.limite_saques
-
-        if excedeu_saldo:
-            return False, "Operação falhou! Saldo insuficiente."
-        elif excedeu_limite:
-            return False, "Operação falhou! Valor excede o limite."
-        elif excedeu_saques:
-            return False, "Operação falhou! Limite de saques diários excedido."
-        elif valor > 0:
-            self.saldo -= valor
-            self.extrato.append(f"[{self._data_atual()}] Saque:\t\tR$ {valor:.2f}")
-            self.numero_saques += 1
-            return True, "Saque realizado com sucesso!"
-        else:
-            return False, "Operação falhou! Valor inválido."
-    
-    def exibir_extrato(self):
-        extrato_texto = "================ EXTRATO ================\n"
-        if self.extrato:
-            for linha in self.extrato:
-                extrato_texto += linha + "\n"
-        else:
-            extrato_texto += "Nenhuma movimentação realizada.\n"
-        extrato_texto += f"\nSaldo:\t\tR$ {self.saldo:.2f}\n"
-        extrato_texto += "=========================================="
-        return extrato_texto
-    
-    def _data_atual(self):
-        return datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-
-class Banco:
-    def __init__(self, agencia):
-        self.agencia = agencia
-        self.usuarios = []
-        self.contas = []
-    
-    def criar_usuario(self, nome, data_nascimento, cpf, endereco):
-        if self.filtrar_usuario(cpf):
-            return False, "Já existe um usuário com esse CPF!"
-        
-        novo_usuario = Usuario(nome, data_nascimento, cpf, endereco)
-        self.usuarios.append(novo_usuario)
-        return True, "Usuário criado com sucesso!"
-    
-    def filtrar_usuario(self, cpf):
-        for usuario in self.usuarios:
-            if usuario.cpf == cpf:
-                return usuario
-        return None
-    
-    def criar_conta(self, cpf_usuario):
-        usuario = self.filtrar_usuario(cpf_usuario)
-        if not usuario:
-            return False, "Usuário não encontrado! Criação de conta cancelada."
-        
-        numero_conta = len(self.contas) + 1
-        nova_conta = Conta(self.agencia, numero_conta, usuario)
-        self.contas.append(nova_conta)
-        return True, "Conta criada com sucesso!", nova_conta
-    
-    def listar_contas(self):
-        if not self.contas:
-            return "Nenhuma conta cadastrada."
-        
-        lista_texto = "========= LISTA DE CONTAS =========\n"
-        for conta in self.contas:
-            linha = f"""
-                Agência: {conta.agencia}
-                Conta: {conta.numero_conta}
-                Titular: {conta.usuario.nome}
-                CPF: {conta.usuario.cpf}
-            """
-            lista_texto += "=" * 40 + "\n"
-            lista_texto += textwrap.dedent(linha) + "\n"
-        return lista_texto
-
-# Inicializar o banco na sessão do Streamlit
-if 'banco' not in st.session_state:
-    st.session_state.banco = Banco("0001")
+# A conta selecionada continua sendo por sessão
+if 'conta_atual' not in st.session_state:
     st.session_state.conta_atual = None
 
-banco = st.session_state.banco
+banco = get_banco()
 conta_atual = st.session_state.conta_atual
 
 # Menu principal
@@ -130,7 +49,7 @@ if opcao == "Depositar":
     else:
         valor = st.number_input("Valor para depósito:", min_value=0.01, step=0.01)
         if st.button("Realizar Depósito"):
-            sucesso, mensagem = conta_atual.depositar(valor)
+            sucesso, mensagem = banco.depositar(conta_atual, valor)
             if sucesso:
                 st.success(mensagem)
             else:
@@ -144,7 +63,7 @@ elif opcao == "Sacar":
     else:
         valor = st.number_input("Valor para saque:", min_value=0.01, step=0.01)
         if st.button("Realizar Saque"):
-            sucesso, mensagem = conta_atual.sacar(valor)
+            sucesso, mensagem = banco.sacar(conta_atual, valor)
             if sucesso:
                 st.success(mensagem)
             else:
@@ -156,14 +75,19 @@ elif opcao == "Extrato":
     if not conta_atual:
         st.warning("Selecione uma conta primeiro na seção Usuários/Contas!")
     else:
-        extrato = conta_atual.exibir_extrato()
+        # Só a página escolhida é formatada; a última (mais recente) por padrão
+        tamanho_pagina = 50
+        total_paginas = conta_atual.extrato.total_paginas(tamanho_pagina)
+        pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, value=total_paginas, step=1)
+        extrato = conta_atual.exibir_extrato(pagina=pagina, tamanho_pagina=tamanho_pagina)
         st.text_area("Extrato da Conta:", extrato, height=300)
+        st.caption(f"Página {pagina} de {total_paginas} ({len(conta_atual.extrato)} lançamentos)")
 
 elif opcao == "Usuários/Contas":
     st.header("👥 Usuários e Contas")
     
     sub_opcao = st.radio("Selecione:", 
-                         ["Novo Usuário", "Nova Conta", "Listar Contas", "Selecionar Conta"])
+                         ["Novo Usuário", "Nova Conta", "Listar Contas", "Selecionar Conta", "Importar Lote"])
     
     if sub_opcao == "Novo Usuário":
         st.subheader("Cadastrar Novo Usuário")
@@ -220,10 +144,25 @@ elif opcao == "Usuários/Contas":
                 st.rerun()
         else:
             st.warning("Nenhuma conta cadastrada!")
+    
+    elif sub_opcao == "Importar Lote":
+        st.subheader("Importar Lote de Operações")
+        # pandas só é carregado quando o lote é usado
+        from sistema_bancario.lotes import COLUNAS_LOTE, aplicar_lote, ler_operacoes
+        st.caption("CSV com as colunas: " + ", ".join(COLUNAS_LOTE) + " (op: usuario, conta, deposito ou saque)")
+        
+        arquivo = st.file_uploader("Arquivo de operações:", type=["csv"])
+        if arquivo and st.button("Aplicar Lote"):
+            with perfil.span("aplicar_lote"):
+                resultado = aplicar_lote(banco, ler_operacoes(arquivo))
+            aceitas = int(resultado['sucesso'].sum())
+            st.success(f"{aceitas} de {len(resultado)} operações aplicadas.")
+            st.dataframe(resultado, hide_index=True)
 
 # Informações da conta atual
 if conta_atual:
     st.sidebar.success(f"Conta Atual: {conta_atual.usuario.nome}")
     st.sidebar.info(f"Saldo: R$ {conta_atual.saldo:.2f}")
+    st.sidebar.caption(f"Saques na janela atual: {conta_atual.numero_saques}/{conta_atual.limite_saques}")
 else:
     st.sidebar.warning("Nenhuma conta selecionada")
\ No newline at end of file
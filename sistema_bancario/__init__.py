@@ -0,0 +1 @@
+# Núcleo do sistema bancário (pythonbanco.py)
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+
+
+class DiarioOperacoes:
+    """Log de operações só de acréscimo (JSON por linha) com commit em grupo
+
+    Cada registro recebe um número de sequência. Uma thread de gravação junta tudo o que
+    chegou desde o último fsync e grava num único lote; quem registrou espera só até o
+    seu número estar no disco.
+    """
+
+    def __init__(self, caminho, proxima_sequencia=1, sincronizar=True):
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.caminho = caminho
+        self.sincronizar = sincronizar
+        self.lotes = 0
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+        self._pendentes = []
+        self._proxima = proxima_sequencia
+        self._gravado = proxima_sequencia - 1
+        self._fechado = False
+        self._condicao = threading.Condition()
+        self._trava_arquivo = threading.Lock()
+        self._thread = threading.Thread(target=self._gravar_lotes, name="diario-banco", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def ler(caminho, reparar=False):
+        """Registros gravados no log, na ordem; uma última linha incompleta (queda no meio da escrita) é ignorada
+
+        Com `reparar`, o arquivo é cortado no fim da última linha válida, para que os
+        próximos registros não sejam colados na linha incompleta.
+        """
+        if not os.path.exists(caminho):
+            return []
+        registros = []
+        fim_valido = 0
+        with open(caminho, "rb") as arquivo:
+            for linha in arquivo:
+                # Sem quebra de linha o registro não chegou inteiro ao disco (nem foi confirmado)
+                if not linha.endswith(b"\n"):
+                    break
+                try:
+                    registros.append(json.loads(linha))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                fim_valido += len(linha)
+        if reparar and os.path.getsize(caminho) > fim_valido:
+            with open(caminho, "r+b") as arquivo:
+                arquivo.truncate(fim_valido)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+        return registros
+
+    @property
+    def ultima_sequencia(self):
+        with self._condicao:
+            return self._proxima - 1
+
+    def registrar(self, registro):
+        """Enfileira o registro e devolve sua sequência (ainda não necessariamente no disco)"""
+        with self._condicao:
+            sequencia = self._proxima
+            self._proxima += 1
+            self._pendentes.append(json.dumps(dict(registro, seq=sequencia), ensure_ascii=False))
+            self._condicao.notify_all()
+            return sequencia
+
+    def aguardar(self, sequencia):
+        """Bloqueia até a sequência estar gravada (e sincronizada) no disco"""
+        with self._condicao:
+            while self._gravado < sequencia:
+                self._condicao.wait()
+
+    def truncar(self, ate_sequencia):
+        """Descarta o log após um snapshot que já cobre tudo até `ate_sequencia`"""
+        self.aguardar(ate_sequencia)
+        with self._trava_arquivo:
+            # Registros posteriores ao snapshot continuam na fila e vão para o arquivo novo
+            self._arquivo.close()
+            self._arquivo = open(self.caminho, "w", encoding="utf-8")
+
+    def fechar(self):
+        with self._condicao:
+            self._fechado = True
+            self._condicao.notify_all()
+        self._thread.join()
+        self._arquivo.close()
+
+    def _gravar_lotes(self):
+        while True:
+            with self._condicao:
+                while not self._pendentes and not self._fechado:
+                    self._condicao.wait()
+                if not self._pendentes:
+                    return
+                lote = self._pendentes
+                self._pendentes = []
+
+            # Escrita e fsync fora da condição: novos registros continuam entrando na fila e formam o próximo lote
+            with self._trava_arquivo:
+                self._arquivo.write("\n".join(lote) + "\n")
+                self._arquivo.flush()
+                if self.sincronizar:
+                    os.fsync(self._arquivo.fileno())
+
+            with self._condicao:
+                self.lotes += 1
+                self._gravado += len(lote)
+                self._condicao.notify_all()
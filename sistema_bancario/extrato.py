@@ -0,0 +1,67 @@
+import datetime
+from array import array
+from itertools import accumulate
+from bisect import bisect_left, bisect_right
+
+DEPOSITO = 0
+SAQUE = 1
+
+# Rótulos como eram gravados no extrato em texto
+ROTULOS = {DEPOSITO: "Depósito:\t", SAQUE: "Saque:\t\t"}
+
+
+class Extrato:
+    """Livro-razão em colunas (arrays): momento, tipo, valor e saldo acumulado após cada lançamento
+
+    Cerca de 25 bytes por lançamento; o texto só é montado para a página ou período pedido.
+    """
+
+    __slots__ = ("momentos", "tipos", "valores", "saldos")
+
+    def __init__(self):
+        self.momentos = array("d")
+        self.tipos = array("b")
+        self.valores = array("d")
+        self.saldos = array("d")
+
+    def __len__(self):
+        return len(self.tipos)
+
+    @property
+    def saldo(self):
+        return self.saldos[-1] if self.saldos else 0.0
+
+    def registrar(self, tipo, valor, momento):
+        """Acrescenta um lançamento; `momento` é um timestamp (segundos) não decrescente"""
+        saldo = self.saldo + valor if tipo == DEPOSITO else self.saldo - valor
+        self.momentos.append(momento)
+        self.tipos.append(tipo)
+        self.valores.append(valor)
+        self.saldos.append(saldo)
+        return saldo
+
+    def registrar_varios(self, tipos, valores, momento):
+        """Acrescenta vários lançamentos de uma vez, com o mesmo momento"""
+        sinais = (v if t == DEPOSITO else -v for t, v in zip(tipos, valores))
+        # accumulate devolve o saldo inicial na frente; ele já está no extrato
+        self.saldos.extend(list(accumulate(sinais, initial=self.saldo))[1:])
+        self.momentos.extend([momento] * len(tipos))
+        self.tipos.extend(tipos)
+        self.valores.extend(valores)
+
+    def intervalo(self, inicio=None, fim=None):
+        """(primeiro, último+1) dos lançamentos entre os timestamps `inicio` e `fim`, por busca binária"""
+        primeiro = 0 if inicio is None else bisect_left(self.momentos, inicio)
+        ultimo = len(self) if fim is None else bisect_right(self.momentos, fim)
+        return primeiro, max(primeiro, ultimo)
+
+    def total_paginas(self, tamanho):
+        return max(1, -(-len(self) // tamanho))
+
+    def linhas(self, primeiro, ultimo):
+        """Texto dos lançamentos no intervalo de posições, formatados só agora"""
+        return [
+            f"[{datetime.datetime.fromtimestamp(self.momentos[i]).strftime('%d/%m/%Y %H:%M:%S')}] "
+            f"{ROTULOS[self.tipos[i]]}R$ {self.valores[i]:.2f}"
+            for i in range(primeiro, ultimo)
+        ]
@@ -0,0 +1,70 @@
+from array import array
+
+# Janela padrão dos limites de saque: um dia, em baldes de uma hora
+JANELA_PADRAO = 24 * 60 * 60
+BALDES_PADRAO = 24
+
+
+class JanelaSaques:
+    """Quantidade e valor dos saques numa janela móvel, em um anel de baldes de tempo
+
+    Os totais da janela são mantidos incrementalmente: consultar e registrar custam O(1)
+    (no pior caso zera-se cada balde uma vez), sem percorrer o extrato.
+
+    O anel tem um balde a mais que a janela: um saque só sai da conta depois de
+    completar a janela inteira (até um balde depois), nunca antes.
+    """
+
+    __slots__ = ("janela", "tamanho_balde", "contagens", "valores", "ultimo_balde", "total_contagem", "total_valor")
+
+    def __init__(self, janela=JANELA_PADRAO, baldes=BALDES_PADRAO):
+        self.janela = janela
+        self.tamanho_balde = janela / baldes
+        self.contagens = array("I", bytes(4 * (baldes + 1)))
+        self.valores = array("d", bytes(8 * (baldes + 1)))
+        self.ultimo_balde = None
+        self.total_contagem = 0
+        self.total_valor = 0.0
+
+    def _avancar(self, balde):
+        """Descarta os baldes que saíram da janela até `balde`"""
+        baldes = len(self.contagens)
+        if self.ultimo_balde is None or balde - self.ultimo_balde >= baldes:
+            if self.total_contagem:
+                self.contagens = array("I", bytes(4 * baldes))
+                self.valores = array("d", bytes(8 * baldes))
+            self.total_contagem, self.total_valor = 0, 0.0
+        else:
+            for b in range(self.ultimo_balde + 1, balde + 1):
+                posicao = b % baldes
+                self.total_contagem -= self.contagens[posicao]
+                self.total_valor -= self.valores[posicao]
+                self.contagens[posicao] = 0
+                self.valores[posicao] = 0.0
+        self.ultimo_balde = balde
+
+    def _balde(self, momento):
+        balde = int(momento // self.tamanho_balde)
+        if self.ultimo_balde is None or balde > self.ultimo_balde:
+            self._avancar(balde)
+        return balde
+
+    def quantidade(self, momento):
+        self._balde(momento)
+        return self.total_contagem
+
+    def valor(self, momento):
+        self._balde(momento)
+        # Evita resíduos negativos de ponto flutuante depois de subtrações
+        return max(self.total_valor, 0.0)
+
+    def registrar(self, momento, valor):
+        balde = self._balde(momento)
+        # Lançamentos mais antigos que a janela (ex.: ao reaplicar o diário) não contam mais
+        if balde <= self.ultimo_balde - len(self.contagens):
+            return
+        posicao = balde % len(self.contagens)
+        self.contagens[posicao] += 1
+        self.valores[posicao] += valor
+        self.total_contagem += 1
+        self.total_valor += valor
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from sistema_bancario.extrato import DEPOSITO, SAQUE
+from sistema_bancario.modelos import Usuario
+
+# Colunas aceitas no arquivo de operações; as que não se aplicam à operação ficam vazias
+COLUNAS_LOTE = ["op", "cpf", "nome", "data_nascimento", "endereco", "agencia", "conta", "valor"]
+OPERACOES = ("usuario", "conta", "deposito", "saque")
+
+
+def ler_operacoes(arquivo):
+    """DataFrame de operações a partir de um CSV (caminho ou arquivo enviado)"""
+    df = pd.read_csv(arquivo, dtype=str, keep_default_na=False)
+    return preparar_operacoes(df)
+
+
+def preparar_operacoes(df):
+    """Normaliza tipos e colunas: op em minúsculas, conta inteira, valor float (NaN se inválido)"""
+    df = df.reindex(columns=COLUNAS_LOTE).copy()
+    for coluna in ("op", "cpf", "nome", "data_nascimento", "endereco", "agencia"):
+        df[coluna] = df[coluna].fillna("").astype(str).str.strip()
+    df["op"] = df["op"].str.casefold()
+    df["conta"] = pd.to_numeric(df["conta"], errors="coerce").astype("Int64")
+    df["valor"] = pd.to_numeric(df["valor"], errors="coerce").astype("float64")
+    return df.reset_index(drop=True)
+
+
+def aplicar_lote(banco, operacoes):
+    """Aplica um lote de operações numa única passada validada e devolve o resultado por linha
+
+    Cadastros (usuários e contas) vêm antes das movimentações, na ordem do arquivo. As regras
+    que não dependem da ordem são avaliadas de forma vetorizada; saldo e número de saques,
+    que dependem das linhas anteriores, numa passada por linha sobre variáveis locais.
+    Todo o lote vira um único registro no diário (um fsync).
+    """
+    df = preparar_operacoes(operacoes)
+    n = len(df)
+    op = df["op"].to_numpy()
+    valor = df["valor"].to_numpy()
+    sucesso = np.zeros(n, dtype=bool)
+    mensagem = np.full(n, "Operação falhou! Operação desconhecida.", dtype=object)
+    numero_conta = np.full(n, None, dtype=object)
+
+    movimento = np.isin(op, ("deposito", "saque"))
+    # NaN também cai aqui: a comparação é falsa
+    valor_valido = valor > 0
+    agencias = df["agencia"].where(df["agencia"] != "", banco.agencia).to_numpy()
+    contas = df["conta"].to_numpy(dtype=object, na_value=None)
+
+    registro = {"op": "lote", "momento": None, "usuarios": [], "contas": [], "movimentos": []}
+    with banco._trava:
+        # Cadastros, na ordem
+        for i in np.flatnonzero(op == "usuario"):
+            linha = (df.at[i, "nome"], df.at[i, "data_nascimento"], df.at[i, "cpf"], df.at[i, "endereco"])
+            if not all(linha):
+                mensagem[i] = "Preencha todos os campos!"
+            elif banco.filtrar_usuario(linha[2]):
+                mensagem[i] = "Já existe um usuário com esse CPF!"
+            else:
+                banco._adicionar_usuario(Usuario(*linha))
+                registro["usuarios"].append(linha)
+                sucesso[i], mensagem[i] = True, "Usuário criado com sucesso!"
+
+        for i in np.flatnonzero(op == "conta"):
+            usuario = banco.filtrar_usuario(df.at[i, "cpf"])
+            if not usuario:
+                mensagem[i] = "Usuário não encontrado! Criação de conta cancelada."
+                continue
+            conta = banco._nova_conta(banco.agencia, len(banco.contas) + 1, usuario)
+            banco._adicionar_conta(conta)
+            registro["contas"].append((conta.agencia, conta.numero_conta, usuario.cpf))
+            sucesso[i], mensagem[i], numero_conta[i] = True, "Conta criada com sucesso!", conta.numero_conta
+
+        # Movimentações: resolve as contas e aplica as regras vetorizáveis
+        indices = np.flatnonzero(movimento)
+        objetos = np.array([banco.buscar_conta(agencias[i], contas[i]) for i in indices], dtype=object)
+        encontrada = np.array([conta is not None for conta in objetos], dtype=bool)
+        mensagem[indices[~encontrada]] = "Operação falhou! Conta não encontrada."
+        indices, objetos = indices[encontrada], objetos[encontrada]
+        limite_valor = np.array([conta.limite_valor_saque for conta in objetos], dtype="float64")
+        excedeu_limite = valor[indices] > limite_valor
+        deposito = op[indices] == "deposito"
+
+        travas = [banco._travas_contas[(conta.agencia, conta.numero_conta)] for conta in dict.fromkeys(objetos)]
+        for trava in travas:
+            trava.acquire()
+        try:
+            # Um único momento para o lote inteiro; os limites da janela são avaliados nele
+            momento = banco.relogio()
+            saldos, saques, sacado, lancamentos = {}, {}, {}, {}
+            for k, i in enumerate(indices):
+                conta = objetos[k]
+                if conta not in saldos:
+                    saldos[conta] = conta.saldo
+                    saques[conta] = conta.saques.quantidade(momento)
+                    sacado[conta] = conta.saques.valor(momento)
+                    lancamentos[conta] = ([], [])
+                v = valor[i]
+                if deposito[k]:
+                    if not valor_valido[i]:
+                        mensagem[i] = "Operação falhou! O valor informado é inválido."
+                        continue
+                    saldos[conta] += v
+                    tipo, mensagem[i] = DEPOSITO, "Depósito realizado com sucesso!"
+                # Mesma ordem de verificações de Conta.sacar
+                elif v > saldos[conta]:
+                    mensagem[i] = "Operação falhou! Saldo insuficiente."
+                    continue
+                elif excedeu_limite[k]:
+                    mensagem[i] = "Operação falhou! Valor excede o limite."
+                    continue
+                elif saques[conta] >= conta.limite_saques:
+                    mensagem[i] = "Operação falhou! Limite de saques diários excedido."
+                    continue
+                elif conta.limite_valor_diario is not None and sacado[conta] + v > conta.limite_valor_diario:
+                    mensagem[i] = "Operação falhou! Limite de valor diário de saques excedido."
+                    continue
+                elif valor_valido[i]:
+                    saldos[conta] -= v
+                    saques[conta] += 1
+                    sacado[conta] += v
+                    tipo, mensagem[i] = SAQUE, "Saque realizado com sucesso!"
+                else:
+                    mensagem[i] = "Operação falhou! Valor inválido."
+                    continue
+                sucesso[i] = True
+                lancamentos[conta][0].append(tipo)
+                lancamentos[conta][1].append(float(v))
+
+            registro["momento"] = momento
+            for conta, (tipos, valores) in lancamentos.items():
+                if tipos:
+                    conta._lancar_varios(tipos, valores, momento)
+                    registro["movimentos"].append((conta.agencia, conta.numero_conta, tipos, valores))
+            sequencia = None
+            if registro["usuarios"] or registro["contas"] or registro["movimentos"]:
+                sequencia = banco._registrar(registro)
+        finally:
+            for trava in travas:
+                trava.release()
+
+    banco._confirmar(sequencia)
+    return df.assign(sucesso=sucesso, mensagem=mensagem, numero_conta=numero_conta)
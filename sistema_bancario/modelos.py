@@ -0,0 +1,323 @@
+import os
+import pickle
+import textwrap
+import threading
+import time
+
+from sistema_bancario.diario import DiarioOperacoes
+from sistema_bancario.extrato import DEPOSITO, SAQUE, Extrato
+from sistema_bancario.limites import JANELA_PADRAO, JanelaSaques
+
+class Usuario:
+    def __init__(self, nome, data_nascimento, cpf, endereco):
+        self.nome = nome
+        self.data_nascimento = data_nascimento
+        self.cpf = cpf
+        self.endereco = endereco
+
+class Conta:
+    def __init__(self, agencia, numero_conta, usuario, limite_saques=3, limite_valor_saque=500.0,
+                 limite_valor_diario=None, janela=JANELA_PADRAO, relogio=time.time):
+        self.agencia = agencia
+        self.numero_conta = numero_conta
+        self.usuario = usuario
+        self.extrato = Extrato()
+        self.limite_saques = limite_saques
+        self.limite_valor_saque = limite_valor_saque
+        # Limites de quantidade e de valor valem para a janela móvel (um dia por padrão)
+        self.limite_valor_diario = limite_valor_diario
+        self.saques = JanelaSaques(janela)
+        # Relógio injetável (timestamp em segundos), para testes e simulações
+        self.relogio = relogio
+    
+    @property
+    def numero_saques(self):
+        """Saques feitos dentro da janela atual"""
+        return self.saques.quantidade(self._agora())
+    
+    @property
+    def saldo(self):
+        # Saldo acumulado do último lançamento do extrato
+        return self.extrato.saldo
+    
+    def depositar(self, valor):
+        if valor > 0:
+            self._lancar(DEPOSITO, valor, self._agora())
+            return True, "Depósito realizado com sucesso!"
+        return False, "Operação falhou! O valor informado é inválido."
+    
+    def sacar(self, valor):
+        agora = self._agora()
+        excedeu_saldo = valor > self.saldo
+        excedeu_limite = valor > self.limite_valor_saque
+        excedeu_saques = self.saques.quantidade(agora) >= self.limite_saques
+        excedeu_valor_diario = (
+            self.limite_valor_diario is not None
+            and self.saques.valor(agora) + valor > self.limite_valor_diario
+        )
+
+        if excedeu_saldo:
+            return False, "Operação falhou! Saldo insuficiente."
+        elif excedeu_limite:
+            return False, "Operação falhou! Valor excede o limite."
+        elif excedeu_saques:
+            return False, "Operação falhou! Limite de saques diários excedido."
+        elif excedeu_valor_diario:
+            return False, "Operação falhou! Limite de valor diário de saques excedido."
+        elif valor > 0:
+            self._lancar(SAQUE, valor, agora)
+            return True, "Saque realizado com sucesso!"
+        else:
+            return False, "Operação falhou! Valor inválido."
+    
+    def exibir_extrato(self, pagina=None, tamanho_pagina=50, inicio=None, fim=None):
+        """Texto do extrato; com `pagina` e/ou período (`inicio`/`fim` em datetime) formata só esse trecho"""
+        primeiro, ultimo = self.extrato.intervalo(
+            inicio.timestamp() if inicio else None,
+            fim.timestamp() if fim else None,
+        )
+        if pagina is not None:
+            primeiro = min(ultimo, primeiro + (pagina - 1) * tamanho_pagina)
+            ultimo = min(ultimo, primeiro + tamanho_pagina)
+
+        partes = ["================ EXTRATO ================"]
+        linhas = self.extrato.linhas(primeiro, ultimo)
+        partes.extend(linhas if linhas else ["Nenhuma movimentação realizada."])
+        partes.append(f"\nSaldo:\t\tR$ {self.saldo:.2f}")
+        partes.append("==========================================")
+        return "\n".join(partes)
+    
+    def _lancar(self, tipo, valor, momento):
+        # Ponto único de alteração do estado; usado também ao reaplicar o diário
+        self.extrato.registrar(tipo, valor, momento)
+        if tipo == SAQUE:
+            self.saques.registrar(momento, valor)
+    
+    def _lancar_varios(self, tipos, valores, momento):
+        self.extrato.registrar_varios(tipos, valores, momento)
+        for tipo, valor in zip(tipos, valores):
+            if tipo == SAQUE:
+                self.saques.registrar(momento, valor)
+    
+    def _restaurar_extrato(self, momentos, tipos, valores, saldos):
+        """Carrega as colunas do extrato (snapshot) e refaz a janela de saques a partir delas"""
+        self.extrato.momentos.extend(momentos)
+        self.extrato.tipos.extend(tipos)
+        self.extrato.valores.extend(valores)
+        self.extrato.saldos.extend(saldos)
+        if not momentos:
+            return
+        # Só os saques que ainda podem estar na janela, com o tamanho de janela atual
+        primeiro, ultimo = self.extrato.intervalo(momentos[-1] - self.saques.janela)
+        for i in range(primeiro, ultimo):
+            if tipos[i] == SAQUE:
+                self.saques.registrar(momentos[i], valores[i])
+    
+    def _agora(self):
+        return self.relogio()
+
+class Banco:
+    """Banco compartilhável entre threads: trava por conta e, opcionalmente, diário de operações com snapshots"""
+
+    def __init__(self, agencia, diario=None, caminho_snapshot=None, snapshot_a_cada=None,
+                 limite_valor_diario=None, janela=JANELA_PADRAO, relogio=time.time):
+        self.agencia = agencia
+        # Parâmetros das contas novas
+        self.limite_valor_diario = limite_valor_diario
+        self.janela = janela
+        self.relogio = relogio
+        self.usuarios = []
+        self.contas = []
+        # Índices em hash: buscas O(1) em vez de varrer as listas
+        self._usuarios_por_cpf = {}
+        self._contas_por_numero = {}
+        self._contas_por_cpf = {}
+        # Durabilidade: cada operação confirmada é gravada no diário antes de retornar
+        self.diario = diario
+        self.caminho_snapshot = caminho_snapshot
+        self.snapshot_a_cada = snapshot_a_cada
+        self._registros_desde_snapshot = 0
+        # Cadastro (usuários/contas) tem uma trava própria; movimentações travam só a conta
+        self._trava = threading.RLock()
+        self._travas_contas = {}
+        self._trava_snapshot = threading.Lock()
+
+    @classmethod
+    def abrir(cls, agencia, caminho_diario, caminho_snapshot=None, snapshot_a_cada=None, **opcoes):
+        """Recupera o banco do último snapshot mais o diário e continua gravando no mesmo diário"""
+        banco = cls(agencia, caminho_snapshot=caminho_snapshot, snapshot_a_cada=snapshot_a_cada, **opcoes)
+        ultima = 0
+        if caminho_snapshot and os.path.exists(caminho_snapshot):
+            with open(caminho_snapshot, "rb") as arquivo:
+                estado = pickle.load(arquivo)
+            for usuario in estado["usuarios"]:
+                banco._adicionar_usuario(Usuario(*usuario))
+            # Contas são recriadas com a configuração atual do banco; do snapshot vêm só os dados
+            for agencia, numero_conta, cpf, colunas in estado["contas"]:
+                conta = banco._nova_conta(agencia, numero_conta, banco.filtrar_usuario(cpf))
+                conta._restaurar_extrato(*colunas)
+                banco._adicionar_conta(conta)
+            ultima = estado["seq"]
+
+        # Uma cauda incompleta é descartada do arquivo antes de voltar a acrescentar nele
+        for registro in DiarioOperacoes.ler(caminho_diario, reparar=True):
+            # Registros já cobertos pelo snapshot são ignorados
+            if registro["seq"] > ultima:
+                banco._aplicar(registro)
+                ultima = registro["seq"]
+
+        banco.diario = DiarioOperacoes(caminho_diario, proxima_sequencia=ultima + 1)
+        return banco
+    
+    def criar_usuario(self, nome, data_nascimento, cpf, endereco):
+        with self._trava:
+            if self.filtrar_usuario(cpf):
+                return False, "Já existe um usuário com esse CPF!"
+            
+            novo_usuario = Usuario(nome, data_nascimento, cpf, endereco)
+            self._adicionar_usuario(novo_usuario)
+            sequencia = self._registrar({"op": "usuario", "nome": nome, "data_nascimento": data_nascimento, "cpf": cpf, "endereco": endereco})
+        self._confirmar(sequencia)
+        return True, "Usuário criado com sucesso!"
+    
+    def filtrar_usuario(self, cpf):
+        return self._usuarios_por_cpf.get(cpf)
+    
+    def buscar_conta(self, agencia, numero_conta):
+        return self._contas_por_numero.get((agencia, numero_conta))
+    
+    def contas_do_usuario(self, cpf):
+        return list(self._contas_por_cpf.get(cpf, ()))
+    
+    def criar_conta(self, cpf_usuario):
+        with self._trava:
+            usuario = self.filtrar_usuario(cpf_usuario)
+            if not usuario:
+                return False, "Usuário não encontrado! Criação de conta cancelada."
+            
+            numero_conta = len(self.contas) + 1
+            nova_conta = self._nova_conta(self.agencia, numero_conta, usuario)
+            self._adicionar_conta(nova_conta)
+            sequencia = self._registrar({"op": "conta", "agencia": self.agencia, "conta": numero_conta, "cpf": usuario.cpf})
+        self._confirmar(sequencia)
+        return True, "Conta criada com sucesso!", nova_conta
+    
+    def depositar(self, conta, valor):
+        """Conta.depositar sob a trava da conta, registrado no diário"""
+        return self._movimentar(conta, conta.depositar, "deposito", valor)
+    
+    def sacar(self, conta, valor):
+        """Conta.sacar sob a trava da conta, registrado no diário"""
+        return self._movimentar(conta, conta.sacar, "saque", valor)
+    
+    def salvar_snapshot(self):
+        """Grava o estado completo e descarta o diário já coberto por ele"""
+        if not self.caminho_snapshot:
+            return
+        with self._trava_snapshot, self._trava:
+            # Para o mundo: com todas as contas travadas nenhuma operação entra no diário
+            travas = list(self._travas_contas.values())
+            for trava in travas:
+                trava.acquire()
+            try:
+                sequencia = self.diario.ultima_sequencia if self.diario else 0
+                if self.diario:
+                    self.diario.aguardar(sequencia)
+                temporario = self.caminho_snapshot + ".tmp"
+                with open(temporario, "wb") as arquivo:
+                    pickle.dump({
+                        "agencia": self.agencia,
+                        "usuarios": [(u.nome, u.data_nascimento, u.cpf, u.endereco) for u in self.usuarios],
+                        "contas": [
+                            (c.agencia, c.numero_conta, c.usuario.cpf,
+                             (c.extrato.momentos, c.extrato.tipos, c.extrato.valores, c.extrato.saldos))
+                            for c in self.contas
+                        ],
+                        "seq": sequencia,
+                    }, arquivo)
+                    arquivo.flush()
+                    os.fsync(arquivo.fileno())
+                os.replace(temporario, self.caminho_snapshot)
+                if self.diario:
+                    self.diario.truncar(sequencia)
+                self._registros_desde_snapshot = 0
+            finally:
+                for trava in travas:
+                    trava.release()
+    
+    def _movimentar(self, conta, operacao, op, valor):
+        with self._travas_contas[(conta.agencia, conta.numero_conta)]:
+            resultado = operacao(valor)
+            sequencia = None
+            if resultado[0]:
+                sequencia = self._registrar({
+                    "op": op,
+                    "agencia": conta.agencia,
+                    "conta": conta.numero_conta,
+                    "valor": valor,
+                    "momento": conta.extrato.momentos[-1],
+                })
+        # A espera pelo disco fica fora da trava: outras operações da conta entram no mesmo lote
+        self._confirmar(sequencia)
+        return resultado
+    
+    def _registrar(self, registro):
+        if self.diario is None:
+            return None
+        return self.diario.registrar(registro)
+    
+    def _confirmar(self, sequencia):
+        if sequencia is None:
+            return
+        self.diario.aguardar(sequencia)
+        self._registros_desde_snapshot += 1
+        if self.snapshot_a_cada and self._registros_desde_snapshot >= self.snapshot_a_cada and not self._trava_snapshot.locked():
+            self.salvar_snapshot()
+    
+    def _nova_conta(self, agencia, numero_conta, usuario):
+        return Conta(agencia, numero_conta, usuario, limite_valor_diario=self.limite_valor_diario,
+                     janela=self.janela, relogio=self.relogio)
+    
+    def _adicionar_usuario(self, usuario):
+        self.usuarios.append(usuario)
+        self._usuarios_por_cpf[usuario.cpf] = usuario
+    
+    def _adicionar_conta(self, conta):
+        self.contas.append(conta)
+        self._contas_por_numero[(conta.agencia, conta.numero_conta)] = conta
+        self._contas_por_cpf.setdefault(conta.usuario.cpf, []).append(conta)
+        self._travas_contas[(conta.agencia, conta.numero_conta)] = threading.Lock()
+    
+    def _aplicar(self, registro):
+        """Reaplica um registro do diário (sem validar limites: ele já foi aceito quando gravado)"""
+        op = registro["op"]
+        if op == "usuario":
+            self._adicionar_usuario(Usuario(registro["nome"], registro["data_nascimento"], registro["cpf"], registro["endereco"]))
+        elif op == "conta":
+            self._adicionar_conta(self._nova_conta(registro["agencia"], registro["conta"], self.filtrar_usuario(registro["cpf"])))
+        elif op == "lote":
+            for usuario in registro["usuarios"]:
+                self._adicionar_usuario(Usuario(*usuario))
+            for agencia, numero_conta, cpf in registro["contas"]:
+                self._adicionar_conta(self._nova_conta(agencia, numero_conta, self.filtrar_usuario(cpf)))
+            for agencia, numero_conta, tipos, valores in registro["movimentos"]:
+                self.buscar_conta(agencia, numero_conta)._lancar_varios(tipos, valores, registro["momento"])
+        else:
+            conta = self.buscar_conta(registro["agencia"], registro["conta"])
+            conta._lancar(DEPOSITO if op == "deposito" else SAQUE, registro["valor"], registro["momento"])
+    
+    def listar_contas(self):
+        if not self.contas:
+            return "Nenhuma conta cadastrada."
+        
+        lista_texto = "========= LISTA DE CONTAS =========\n"
+        for conta in self.contas:
+            linha = f"""
+                Agência: {conta.agencia}
+                Conta: {conta.numero_conta}
+                Titular: {conta.usuario.nome}
+                CPF: {conta.usuario.cpf}
+            """
+            lista_texto += "=" * 40 + "\n"
+            lista_texto += textwrap.dedent(linha) + "\n"
+        return lista_texto
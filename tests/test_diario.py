@@ -0,0 +1,41 @@
+from sistema_bancario.diario import DiarioOperacoes
+from sistema_bancario.modelos import Banco
+
+
+def criar_banco(caminho_diario):
+    banco = Banco.abrir("0001", caminho_diario)
+    banco.criar_usuario("Ana", "01-01-1990", "1", "")
+    conta = banco.criar_conta("1")[2]
+    banco.depositar(conta, 100)
+    banco.diario.fechar()
+
+
+def test_cauda_incompleta_e_descartada_antes_de_novos_registros(tmp_path):
+    caminho_diario = str(tmp_path / "diario.log")
+    criar_banco(caminho_diario)
+    # Queda no meio da escrita: metade de um registro sem quebra de linha
+    with open(caminho_diario, "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"op": "deposito", "agencia": "0001", "con')
+
+    banco = Banco.abrir("0001", caminho_diario)
+    conta = banco.contas[0]
+    assert conta.saldo == 100.0
+    banco.depositar(conta, 50)
+    banco.depositar(conta, 25)
+    banco.diario.fechar()
+
+    recuperado = Banco.abrir("0001", caminho_diario)
+    assert recuperado.contas[0].saldo == 175.0
+    recuperado.diario.fechar()
+
+
+def test_registro_sem_quebra_de_linha_nao_e_aplicado(tmp_path):
+    caminho_diario = str(tmp_path / "diario.log")
+    criar_banco(caminho_diario)
+    tamanho = (tmp_path / "diario.log").stat().st_size
+    # JSON completo, mas a quebra de linha não chegou ao disco: o registro não foi confirmado
+    with open(caminho_diario, "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"op": "deposito", "agencia": "0001", "conta": 1, "valor": 10, "momento": 0, "seq": 4}')
+
+    assert len(DiarioOperacoes.ler(caminho_diario, reparar=True)) == 3
+    assert (tmp_path / "diario.log").stat().st_size == tamanho
@@ -0,0 +1,116 @@
+from sistema_bancario.limites import JANELA_PADRAO, JanelaSaques
+from sistema_bancario.modelos import Banco, Conta, Usuario
+
+HORA = 60 * 60
+
+
+class Relogio:
+    """Relógio manual para os testes: o tempo só anda quando mandamos"""
+
+    def __init__(self, agora=0.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+    def avancar(self, segundos):
+        self.agora += segundos
+
+
+def nova_conta(relogio, **opcoes):
+    conta = Conta("0001", 1, Usuario("Ana", "01-01-1990", "1", ""), relogio=relogio, **opcoes)
+    conta.depositar(10_000)
+    return conta
+
+
+def test_saque_nao_sai_da_janela_antes_de_um_dia():
+    janela = JanelaSaques()
+    for _ in range(3):
+        janela.registrar(0.9 * HORA, 100.0)
+
+    assert janela.quantidade(0.9 * HORA + JANELA_PADRAO - 1) == 3
+    assert janela.valor(0.9 * HORA + JANELA_PADRAO - 1) == 300.0
+
+
+def test_janela_zera_depois_de_um_dia():
+    relogio = Relogio(0.9 * HORA)
+    conta = nova_conta(relogio)
+    for _ in range(3):
+        assert conta.sacar(100)[0]
+
+    relogio.avancar(JANELA_PADRAO - 1)
+    assert conta.numero_saques == 3
+    assert not conta.sacar(100)[0]
+
+    # Até um balde (uma hora) depois da janela completa, o limite é liberado
+    relogio.avancar(HORA + 1)
+    assert conta.numero_saques == 0
+    assert conta.sacar(100)[0]
+
+
+def test_limite_de_quantidade():
+    relogio = Relogio()
+    conta = nova_conta(relogio, limite_saques=2)
+    assert conta.sacar(10)[0]
+    relogio.avancar(HORA)
+    assert conta.sacar(10)[0]
+    relogio.avancar(HORA)
+
+    sucesso, mensagem = conta.sacar(10)
+    assert not sucesso
+    assert "Limite de saques" in mensagem
+
+
+def test_limite_de_valor_diario():
+    relogio = Relogio()
+    conta = nova_conta(relogio, limite_saques=10, limite_valor_diario=800.0)
+    assert conta.sacar(500)[0]
+    relogio.avancar(HORA)
+
+    sucesso, mensagem = conta.sacar(400)
+    assert not sucesso
+    assert "valor diário" in mensagem
+    assert conta.sacar(300)[0]
+    assert conta.saques.valor(relogio()) == 800.0
+
+
+def test_janela_reconstruida_ao_reaplicar_diario(tmp_path):
+    relogio = Relogio(10 * HORA)
+    caminho_diario = tmp_path / "diario.log"
+    banco = Banco.abrir("0001", str(caminho_diario), relogio=relogio)
+    banco.criar_usuario("Ana", "01-01-1990", "1", "")
+    conta = banco.criar_conta("1")[2]
+    banco.depositar(conta, 1000)
+    for _ in range(3):
+        assert banco.sacar(conta, 100)[0]
+    banco.diario.fechar()
+
+    relogio.avancar(HORA)
+    recuperado = Banco.abrir("0001", str(caminho_diario), relogio=relogio)
+    conta = recuperado.contas[0]
+    assert conta.saldo == 700.0
+    assert conta.numero_saques == 3
+    assert not recuperado.sacar(conta, 100)[0]
+
+    relogio.avancar(JANELA_PADRAO)
+    assert recuperado.sacar(conta, 100)[0]
+    recuperado.diario.fechar()
+
+
+def test_janela_reconstruida_do_snapshot(tmp_path):
+    relogio = Relogio(10 * HORA)
+    caminho_diario, caminho_snapshot = str(tmp_path / "diario.log"), str(tmp_path / "snapshot.pkl")
+    banco = Banco.abrir("0001", caminho_diario, caminho_snapshot, relogio=relogio)
+    banco.criar_usuario("Ana", "01-01-1990", "1", "")
+    conta = banco.criar_conta("1")[2]
+    banco.depositar(conta, 1000)
+    for _ in range(3):
+        banco.sacar(conta, 100)
+    banco.salvar_snapshot()
+    banco.diario.fechar()
+
+    recuperado = Banco.abrir("0001", caminho_diario, caminho_snapshot, relogio=relogio)
+    conta = recuperado.contas[0]
+    assert conta.saldo == 700.0
+    assert conta.numero_saques == 3
+    recuperado.diario.fechar()